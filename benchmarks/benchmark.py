@@ -0,0 +1,267 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from . import pathmagic
+pathmagic.add_to_path(1)
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from complexity import ComplexityModel, Spec, TermFrequencyTable
+from complexity.profiling import ProfileCollector
+from .corpus import generate_corpus
+
+
+STOPWORDS = str(Path(__file__).absolute().parents[1] / 'data' / 'stopwords.txt')
+
+CASES = [
+    dict(name='word-distance', tokenizer='tokenizers.word_tokenizer.WordTokenizer', arguments=['stopwords'],
+         function='functions.distance_cf.DistanceComplexityFunction', alphabet='full', languages=['en', 'ru']),
+    dict(name='word-length', tokenizer='tokenizers.word_tokenizer.WordTokenizer', arguments=['stopwords'],
+         function='functions.length_cf.LengthComplexityFunction', alphabet='reduced', languages=['en', 'ru']),
+    dict(name='word-counter', tokenizer='tokenizers.word_tokenizer.WordTokenizer', arguments=['stopwords'],
+         function='functions.counter_cf.LexicalCounterComplexityFunction', function_arguments=['tf'],
+         alphabet='reduced', languages=['en', 'ru']),
+    dict(name='letters-distance', tokenizer='tokenizers.letters_tokenizer.LetterTokenizer', arguments=['stopwords'],
+         function='functions.distance_cf.DistanceComplexityFunction', alphabet='full', languages=['en', 'ru']),
+    dict(name='en-syllab-distance', tokenizer='tokenizers.en_syllab_tokenizer.EnSyllabTokenizer',
+         arguments=['stopwords'], function='functions.distance_cf.DistanceComplexityFunction', alphabet='full',
+         languages=['en']),
+    dict(name='en-syllab-sorted-distance',
+         tokenizer='tokenizers.en_syllab_sorted_tokenizer.EnSyllabSortedTokenizer', arguments=['stopwords'],
+         function='functions.distance_cf.DistanceComplexityFunction', alphabet='full', languages=['en']),
+    dict(name='ru-syllab-distance', tokenizer='tokenizers.ru_syllab_tokenizer.RuSyllabTokenizer',
+         arguments=['stopwords'], function='functions.distance_cf.DistanceComplexityFunction', alphabet='full',
+         languages=['ru']),
+    dict(name='ru-syllab-sorted-distance',
+         tokenizer='tokenizers.ru_syllab_sorted_tokenizer.RuSyllabSortedTokenizer', arguments=['stopwords'],
+         function='functions.distance_cf.DistanceComplexityFunction', alphabet='full', languages=['ru']),
+    dict(name='en-sentence-length', tokenizer='tokenizers.en_sentence_tokenizer.EnSentenceTokenizer', arguments=[],
+         function='functions.length_cf.LengthComplexityFunction', alphabet='reduced', languages=['en'],
+         requires='spacy'),
+    dict(name='ru-sentence-length', tokenizer='tokenizers.ru_sentence_tokenizer.RuSentenceTokenizer', arguments=[],
+         function='functions.length_cf.LengthComplexityFunction', alphabet='reduced', languages=['ru']),
+    dict(name='syntax-length', tokenizer='tokenizers.udpipe_tokenizer.UdPipeTokenizer', arguments=['udpipe'],
+         function='functions.syntax_length_cf.SyntaxLengthComplexityFunction', alphabet='reduced',
+         languages=['en', 'ru'], requires='udpipe'),
+    dict(name='syntax-pos', tokenizer='tokenizers.udpipe_tokenizer_pos.UdPipePOSTokenizer', arguments=['udpipe'],
+         function='functions.distance_cf.DistanceComplexityFunction', alphabet='full', languages=['en', 'ru'],
+         requires='udpipe'),
+]
+
+
+def peak_rss_megabytes(who):
+    """
+    :Description: returns the peak resident set size of the process or of its waited-for children in megabytes
+    """
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def count_errors(collector):
+    return collector.report['total']['counts'].get('errors', 0)
+
+
+def build_tf(corpus_path, tf_path, tokenizer, use_preproc, n_jobs, start_method):
+    """
+    :Description: counts the term frequencies of the collection for the ``LexicalCounterComplexityFunction`` with
+     the tokenizer and the preprocessing of the benchmarked model and saves the table into the directory
+    """
+    collector = ProfileCollector()
+    table = TermFrequencyTable.fit(corpus_path, tokenizer, n_jobs=n_jobs, start_method=start_method,
+                                   use_preproc=use_preproc, hook=collector)
+    if count_errors(collector) > 0:
+        raise RuntimeError('{} documents failed while counting the term frequencies'.format(count_errors(collector)))
+    table.save(tf_path)
+
+
+def run_case(case, resources, corpus_path, n_jobs, texts, results):
+    """
+    :Description: fits and applies the model of the benchmark case in a fresh process, so that the peak RSS of
+     the process and of its fit workers belongs to this case only
+    """
+    try:
+        tokenizer = Spec(case['tokenizer'], *[resources[argument] for argument in case['arguments']])
+        complexity_function = Spec(case['function'],
+                                   *[resources[argument] for argument in case.get('function_arguments', [])])
+        try:
+            tokenizer.instance()
+            complexity_function.instance()
+        except ImportError as e:
+            results.put(dict(status='skipped', reason='missing dependency: {}'.format(e)))
+            return
+        model = ComplexityModel(tokenizer, complexity_function, alphabet=case['alphabet'])
+
+        collector = ProfileCollector()
+        start = time.perf_counter()
+        model.fit(corpus_path, n_jobs=n_jobs, use_preproc=resources['use_preproc'], hook=collector)
+        fit_seconds = time.perf_counter() - start
+        if count_errors(collector) > 0:
+            results.put(dict(status='failed', reason='{} documents failed'.format(count_errors(collector))))
+            return
+
+        start = time.perf_counter()
+        model.predict(texts, use_preproc=resources['use_preproc'])
+        predict_seconds = time.perf_counter() - start
+
+        results.put(dict(status='ok', fit_seconds=fit_seconds, predict_seconds=predict_seconds,
+                         tokens=len(model.distributions), distinct_scores=len(model.distributions.scores),
+                         peak_rss_mb=peak_rss_megabytes(resource.RUSAGE_SELF),
+                         workers_peak_rss_mb=peak_rss_megabytes(resource.RUSAGE_CHILDREN)))
+    except Exception:
+        results.put(dict(status='failed', reason=traceback.format_exc()))
+
+
+def run(output, workdir, cases=None, languages=('en', 'ru'), jobs=(1, 2, 4), documents=1000, mean_length=500,
+        skew=1.0, predict_documents=100, use_preproc=False, udpipe=None, skip_udpipe=False, skip_spacy=False,
+        start_method='spawn'):
+    """
+    :Description: generates the synthetic collections and runs the benchmark cases, writing the results to the
+     JSON file
+    :param output: path to the JSON file with the results
+    :type output: str
+    :param workdir: path to the directory for the collections and intermediate files
+    :type workdir: str
+    :param cases: names of the cases to run, all of them if None, defaults to None
+    :type cases: list, optional
+    :param udpipe: paths to the UDPipe models by language, the syntax cases are skipped for the languages without
+     a model, defaults to None
+    :type udpipe: dict, optional
+    """
+    context = multiprocessing.get_context(start_method)
+    report = dict(environment=environment(), parameters=dict(documents=documents, mean_length=mean_length,
+                                                             skew=skew, predict_documents=predict_documents,
+                                                             use_preproc=use_preproc, jobs=list(jobs)),
+                  results=[])
+    for language in languages:
+        corpus_path = os.path.join(workdir, 'corpus-{}-{}-{}-{}'.format(language, documents, mean_length, skew))
+        number, size = generate_corpus(corpus_path, language=language, documents=documents,
+                                       mean_length=mean_length, skew=skew)
+        texts = []
+        for i in range(min(predict_documents, number)):
+            with open(os.path.join(corpus_path, '{}.txt'.format(i)), 'r') as f:
+                texts += [f.read()]
+        resources = dict(stopwords=STOPWORDS, udpipe=(udpipe or {}).get(language), use_preproc=use_preproc)
+
+        for case in CASES:
+            if cases and case['name'] not in cases or language not in case['languages']:
+                continue
+            requirement = case.get('requires')
+            skip_reason = None
+            if requirement == 'udpipe' and (skip_udpipe or resources['udpipe'] is None):
+                skip_reason = 'UDPipe skipped or no model for the language'
+            if requirement == 'spacy' and skip_spacy:
+                skip_reason = 'spaCy skipped'
+            failure = None
+            if skip_reason is None and 'tf' in case.get('function_arguments', []):
+                resources['tf'] = os.path.join(workdir, 'tf-{}-{}'.format(language, case['name']))
+                tokenizer = Spec(case['tokenizer'], *[resources[argument] for argument in case['arguments']])
+                try:
+                    tokenizer.instance()
+                    build_tf(corpus_path, resources['tf'], tokenizer, use_preproc, max(jobs), start_method)
+                except ImportError as e:
+                    skip_reason = 'missing dependency: {}'.format(e)
+                except Exception:
+                    failure = traceback.format_exc()
+            for n_jobs in jobs:
+                entry = dict(case=case['name'], language=language, n_jobs=n_jobs, documents=number, bytes=size)
+                if skip_reason is not None:
+                    entry.update(status='skipped', reason=skip_reason)
+                elif failure is not None:
+                    entry.update(status='failed', reason=failure)
+                else:
+                    results = context.Queue()
+                    process = context.Process(target=run_case,
+                                              args=[case, resources, corpus_path, n_jobs, texts, results])
+                    process.start()
+                    entry.update(results.get())
+                    process.join()
+                if entry['status'] == 'ok':
+                    entry['fit_documents_per_second'] = number / entry['fit_seconds']
+                    entry['fit_megabytes_per_second'] = size / 2 ** 20 / entry['fit_seconds']
+                    entry['predict_documents_per_second'] = len(texts) / entry['predict_seconds']
+                report['results'] += [entry]
+                print(json.dumps(entry), flush=True)
+                if entry['status'] == 'skipped' or failure is not None:
+                    break
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def environment():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__),
+                                           stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return dict(revision=revision, python=platform.python_version(), platform=platform.platform(),
+                cpus=os.cpu_count(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+
+def compare(baseline, current):
+    """
+    :Description: prints the ratios of the fit and predict times of the current results to the baseline ones
+    :param baseline: path to the JSON file with the baseline results
+    :type baseline: str
+    :param current: path to the JSON file with the current results
+    :type current: str
+    """
+    def index(path):
+        with open(path, 'r') as f:
+            results = json.load(f)['results']
+        return {(entry['case'], entry['language'], entry['n_jobs']): entry for entry in results
+                if entry['status'] == 'ok'}
+
+    baseline, current = index(baseline), index(current)
+    for key in sorted(set(baseline) & set(current)):
+        print('{:<28} {:<3} n_jobs={:<3} fit x{:.2f} predict x{:.2f} rss x{:.2f}'.format(
+            *key, current[key]['fit_seconds'] / baseline[key]['fit_seconds'],
+            current[key]['predict_seconds'] / baseline[key]['predict_seconds'],
+            current[key]['peak_rss_mb'] / baseline[key]['peak_rss_mb']))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-o', '--output', nargs='*', default=['benchmark.json'], help='path to the results file')
+    parser.add_argument('-w', '--workdir', nargs='*', default=['benchmark-data'],
+                        help='path to the directory for the generated collections')
+    parser.add_argument('-c', '--cases', nargs='*', help='names of the cases to run, all by default')
+    parser.add_argument('-l', '--languages', nargs='*', default=['en', 'ru'], help='languages of the collections')
+    parser.add_argument('-j', '--jobs', nargs='*', type=int, default=[1, 2, 4], help='numbers of fit jobs')
+    parser.add_argument('-d', '--documents', nargs='*', type=int, default=[1000], help='number of documents')
+    parser.add_argument('-m', '--mean-length', nargs='*', type=int, default=[500],
+                        help='mean number of words in a document')
+    parser.add_argument('-k', '--skew', nargs='*', type=float, default=[1.0],
+                        help='sigma of the log-normal distribution of document lengths')
+    parser.add_argument('-n', '--predict-documents', nargs='*', type=int, default=[100],
+                        help='number of documents to predict')
+    parser.add_argument('--preproc', action='store_true', help='preprocess the documents before tokenizing')
+    parser.add_argument('--udpipe-en', nargs='*', help='path to the English UDPipe model')
+    parser.add_argument('--udpipe-ru', nargs='*', help='path to the Russian UDPipe model')
+    parser.add_argument('--skip-udpipe', action='store_true', help='skip the UDPipe cases')
+    parser.add_argument('--skip-spacy', action='store_true', help='skip the spaCy cases')
+    parser.add_argument('--compare', nargs='*', help='paths to the baseline and the current results to compare')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare[0], args.compare[1])
+    else:
+        udpipe = {language: paths[0] for language, paths in [('en', args.udpipe_en), ('ru', args.udpipe_ru)]
+                  if paths}
+        run(args.output[0], args.workdir[0], cases=args.cases, languages=args.languages, jobs=args.jobs,
+            documents=args.documents[0], mean_length=args.mean_length[0], skew=args.skew[0],
+            predict_documents=args.predict_documents[0], use_preproc=args.preproc, udpipe=udpipe,
+            skip_udpipe=args.skip_udpipe, skip_spacy=args.skip_spacy)
@@ -0,0 +1,108 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+import os
+
+import numpy as np
+
+
+ALPHABETS = {
+    'en': ('bcdfghjklmnprstvwz', 'aeiouy'),
+    'ru': ('бвгджзклмнпрстфхцчшщ', 'аеиоуыэюя'),
+}
+
+
+def make_vocabulary(language, size, rng):
+    """
+    :Description: generates ``size`` distinct pseudo-words of 1 to 4 consonant-vowel syllables in random order
+    :param language: ``en`` or ``ru``
+    :type language: str
+    :param size: number of words
+    :type size: int
+    :param rng: random generator
+    :type rng: np.random.Generator
+    """
+    consonants, vowels = ALPHABETS[language]
+    words = set()
+    while len(words) < size:
+        syllables = rng.integers(1, 5)
+        word = ''.join(consonants[rng.integers(len(consonants))] + vowels[rng.integers(len(vowels))] +
+                       (consonants[rng.integers(len(consonants))] if rng.random() < 0.3 else '')
+                       for _ in range(syllables))
+        words.add(word)
+    return [str(word) for word in rng.permutation(sorted(words))]
+
+
+def make_document(words, probabilities, length, rng):
+    indices = rng.choice(len(words), size=length, p=probabilities)
+    sentences = []
+    position = 0
+    while position < length:
+        sentence_length = int(rng.integers(5, 25))
+        sentence = [words[i] for i in indices[position:position + sentence_length]]
+        sentence[0] = sentence[0].capitalize()
+        sentences += [' '.join(sentence) + '.']
+        position += sentence_length
+    return ' '.join(sentences)
+
+
+def generate_corpus(path, language='en', documents=1000, mean_length=500, skew=1.0, vocabulary_size=20000,
+                    zipf=1.1, seed=0):
+    """
+    :Description: generates the synthetic reference collection, one ``*.txt`` file per document. Word frequencies
+     follow the Zipf law, document lengths follow the log-normal distribution
+    :param path: path to the directory of the collection
+    :type path: str
+    :param language: ``en`` or ``ru``, defaults to ``en``
+    :type language: str, optional
+    :param documents: number of documents, defaults to 1000
+    :type documents: int, optional
+    :param mean_length: mean number of words in a document, defaults to 500
+    :type mean_length: int, optional
+    :param skew: sigma of the log-normal distribution of document lengths, 0 for documents of equal length,
+     defaults to 1.0
+    :type skew: float, optional
+    :param vocabulary_size: number of distinct words, defaults to 20000
+    :type vocabulary_size: int, optional
+    :param zipf: exponent of the Zipf law, defaults to 1.1
+    :type zipf: float, optional
+    :param seed: random seed, defaults to 0
+    :type seed: int, optional
+    :return: number of documents and total size of the collection in bytes
+    :rtype: tuple
+    """
+    rng = np.random.default_rng(seed)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    words = make_vocabulary(language, vocabulary_size, rng)
+    probabilities = 1 / np.arange(1, vocabulary_size + 1) ** zipf
+    probabilities /= probabilities.sum()
+    lengths = rng.lognormal(np.log(mean_length) - skew ** 2 / 2, skew, size=documents)
+    total_size = 0
+    for i, length in enumerate(np.maximum(lengths.astype(np.int64), 1)):
+        text = make_document(words, probabilities, int(length), rng)
+        with open(os.path.join(path, '{}.txt'.format(i)), 'w') as f:
+            f.write(text)
+        total_size += len(text.encode('utf-8'))
+    return documents, total_size
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-o', '--output', nargs='*', help='path to the directory of the collection')
+    parser.add_argument('-l', '--language', nargs='*', default=['en'], help='language, en or ru')
+    parser.add_argument('-d', '--documents', nargs='*', type=int, default=[1000], help='number of documents')
+    parser.add_argument('-m', '--mean-length', nargs='*', type=int, default=[500],
+                        help='mean number of words in a document')
+    parser.add_argument('-k', '--skew', nargs='*', type=float, default=[1.0],
+                        help='sigma of the log-normal distribution of document lengths')
+    parser.add_argument('-v', '--vocabulary', nargs='*', type=int, default=[20000], help='number of distinct words')
+    parser.add_argument('-s', '--seed', nargs='*', type=int, default=[0], help='random seed')
+    args = parser.parse_args()
+
+    print(generate_corpus(args.output[0], language=args.language[0], documents=args.documents[0],
+                          mean_length=args.mean_length[0], skew=args.skew[0], vocabulary_size=args.vocabulary[0],
+                          seed=args.seed[0]))
@@ -3,3 +3,8 @@
 #
 
 from .complexity_model import ComplexityModel
+from .pipeline import ComplexityPipeline
+from .spec import Spec
+from .token_cache import TokenCache
+from .vocabulary import PooledVocabulary, Vocabulary
+from .tf_table import TermFrequencyTable
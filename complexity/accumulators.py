@@ -0,0 +1,241 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import collections
+
+import numpy as np
+
+from .distributions import DistributionStore, REDUCED_TOKEN
+from .spec import resolve
+from .token_cache import TokenCache, tokenizer_key
+from .vocabulary import Vocabulary
+from .sketch import LogQuantizer
+from .profiling import NULL_PROFILER
+
+
+class DistributionAccumulator:
+    """
+    :Description: accumulates the distributions of token complexity scores over the documents processed by a
+     single fit worker. The tokenizer and the complexity function may be given as specs, then they are built once
+     in the worker by :meth:`start`. Tokens are interned to ids by the worker vocabulary and the occurrences are
+     buffered as flat arrays of ids and scores until there are more than ``buffer_size`` of them. Complexity
+     functions with the ``accepts_ids`` attribute set receive the int array of ids instead of the tokens
+    :param tokenizer: Tokenizer instance or its spec
+    :type tokenizer: Tokenizer or Spec
+    :param complexity_function: ComplexityFunction instance or its spec
+    :type complexity_function: ComplexityFunction or Spec
+    :param alphabet: ``full`` or ``reduced``, see :class:`ComplexityModel`
+    :type alphabet: str
+    :param tokenize_parameters: preprocessing flags passed to ``tokenize``
+    :type tokenize_parameters: dict
+    :param token_cache: path to the :class:`TokenCache` directory, defaults to None
+    :type token_cache: str, optional
+    :param buffer_size: maximum number of buffered occurrences, the buffer is flushed into the store when it is
+     exceeded, defaults to 4194304
+    :type buffer_size: int, optional
+    :param relative_accuracy: relative accuracy of the :class:`LogQuantizer` the scores are quantized with before
+     they are accumulated, exact scores are kept if None, defaults to None
+    :type relative_accuracy: float, optional
+    """
+    def __init__(self, tokenizer, complexity_function, alphabet, tokenize_parameters, token_cache=None,
+                 buffer_size=1 << 22, relative_accuracy=None):
+        self.tokenizer = tokenizer
+        self.complexity_function = complexity_function
+        self.alphabet = alphabet
+        self.tokenize_parameters = tokenize_parameters
+        self.token_cache = token_cache
+        self.store = DistributionStore()
+        self.vocabulary = Vocabulary([REDUCED_TOKEN] if alphabet == 'reduced' else ())
+        self.buffer_size = buffer_size
+        self.quantizer = LogQuantizer(relative_accuracy) if relative_accuracy is not None else None
+        self.profiler = NULL_PROFILER
+        self.buffered = 0
+        self.ids = []
+        self.scores = []
+
+    def start(self):
+        self.tokenizer = resolve(self.tokenizer)
+        self.complexity_function = resolve(self.complexity_function)
+        if self.token_cache is not None:
+            self.token_cache = TokenCache(self.token_cache, self.tokenizer, self.tokenize_parameters,
+                                          profiler=self.profiler)
+
+    def tokenize(self, text):
+        with self.profiler.stage('tokenize'):
+            if self.token_cache is not None:
+                tokens = self.token_cache.tokenize(text)
+            else:
+                tokens = self.tokenizer.tokenize(text, **self.tokenize_parameters)
+        self.profiler.count('tokens', len(tokens))
+        return tokens
+
+    def add(self, text):
+        self.add_tokens(self.tokenize(text))
+
+    def add_tokens(self, tokens, ids=None):
+        """
+        :Description: adds the scores of the tokens of a single document
+        :param tokens: output of the tokenizer
+        :type tokens: list
+        :param ids: ids of the tokens in :attr:`vocabulary`, interned here if not given, defaults to None
+        :type ids: np.ndarray, optional
+        """
+        if self.alphabet == 'full' and ids is None:
+            with self.profiler.stage('intern'):
+                ids = self.vocabulary.intern(tokens)
+        with self.profiler.stage('complexity'):
+            if self.alphabet == 'full' and getattr(self.complexity_function, 'accepts_ids', False):
+                complexities = self.complexity_function.complexity(ids)
+            else:
+                complexities = self.complexity_function.complexity(tokens)
+        if len(complexities) == 0:
+            return
+        with self.profiler.stage('accumulate'):
+            scores = np.asarray(complexities)
+            if self.quantizer is not None:
+                scores = self.quantizer.quantize(scores)
+            if self.alphabet == 'reduced':
+                ids = np.zeros(len(scores), dtype=np.int64)
+            size = min(len(ids), len(scores))
+            self.ids.append(ids[:size])
+            self.scores.append(scores[:size])
+            self.buffered += size
+        self.flush()
+
+    def flush(self):
+        """
+        :Description: merges the buffered occurrences into the store once there are more than ``buffer_size`` of
+         them. Merging costs the size of the store, so small batches are not merged one by one
+        """
+        if self.buffered > self.buffer_size:
+            self.__merge_buffer()
+
+    def __merge_buffer(self):
+        if self.ids:
+            with self.profiler.stage('flush'):
+                store = DistributionStore.from_ids(self.vocabulary, np.concatenate(self.ids),
+                                                   np.concatenate(self.scores))
+                self.store = self.store.merge(store)
+        self.buffered = 0
+        self.ids = []
+        self.scores = []
+
+    def result(self):
+        self.__merge_buffer()
+        return self.store
+
+    @staticmethod
+    def merge(store, other):
+        return store.merge(other)
+
+
+class PipelineAccumulator:
+    """
+    :Description: accumulates the distributions of several models over the same documents. Models with the same
+     tokenizer configuration, see :func:`tokenizer_key`, are grouped once the tokenizers are built by
+     :meth:`start`, each document is tokenized and interned once per group and the tokens are fed to every model of
+     the group
+    :param accumulators: distribution accumulators of the models by their names
+    :type accumulators: dict[str, DistributionAccumulator]
+    """
+    def __init__(self, accumulators):
+        self.accumulators = accumulators
+        self.groups = []
+        self.vocabularies = []
+        self.profiler = NULL_PROFILER
+
+    def start(self):
+        groups = {}
+        for name, accumulator in self.accumulators.items():
+            accumulator.profiler = self.profiler
+            accumulator.start()
+            groups.setdefault(tokenizer_key(accumulator.tokenizer), []).append(name)
+        self.groups = list(groups.values())
+        for group in self.groups:
+            full = [name for name in group if self.accumulators[name].alphabet == 'full']
+            vocabulary = Vocabulary() if full else None
+            for name in full:
+                self.accumulators[name].vocabulary = vocabulary
+            self.vocabularies.append(vocabulary)
+
+    def add(self, text):
+        for group, vocabulary in zip(self.groups, self.vocabularies):
+            tokens = self.accumulators[group[0]].tokenize(text)
+            ids = None
+            if vocabulary is not None:
+                with self.profiler.stage('intern'):
+                    ids = vocabulary.intern(tokens)
+            for name in group:
+                self.accumulators[name].add_tokens(tokens, ids)
+
+    def flush(self):
+        for accumulator in self.accumulators.values():
+            accumulator.flush()
+
+    def result(self):
+        return {name: accumulator.result() for name, accumulator in self.accumulators.items()}
+
+    @staticmethod
+    def merge(stores, other):
+        return {name: store.merge(other[name]) for name, store in stores.items()}
+
+
+class TermFrequencyAccumulator:
+    """
+    :Description: counts the term frequencies of the tokens over the documents processed by a single fit worker.
+     Tokenizers with the ``term_frequencies`` method, like :class:`WordTokenizer` reusing the counts of
+     ``Preprocessing.preproc``, return the counts of a document directly, the output of ``tokenize`` is counted
+     otherwise. The counts are kept in an array indexed by the worker vocabulary
+    :param tokenizer: Tokenizer instance or its spec
+    :type tokenizer: Tokenizer or Spec
+    :param tokenize_parameters: preprocessing flags passed to the tokenizer
+    :type tokenize_parameters: dict
+    :param token_cache: path to the :class:`TokenCache` directory, defaults to None
+    :type token_cache: str, optional
+    """
+    def __init__(self, tokenizer, tokenize_parameters, token_cache=None):
+        self.tokenizer = tokenizer
+        self.tokenize_parameters = tokenize_parameters
+        self.token_cache = token_cache
+        self.vocabulary = Vocabulary()
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.profiler = NULL_PROFILER
+
+    def start(self):
+        self.tokenizer = resolve(self.tokenizer)
+        if self.token_cache is not None:
+            self.token_cache = TokenCache(self.token_cache, self.tokenizer, self.tokenize_parameters,
+                                          profiler=self.profiler)
+
+    def add(self, text):
+        with self.profiler.stage('tokenize'):
+            if self.token_cache is not None:
+                frequencies = collections.Counter(self.token_cache.tokenize(text))
+            elif hasattr(self.tokenizer, 'term_frequencies'):
+                frequencies = self.tokenizer.term_frequencies(text, **self.tokenize_parameters)
+            else:
+                frequencies = collections.Counter(self.tokenizer.tokenize(text, **self.tokenize_parameters))
+        with self.profiler.stage('accumulate'):
+            ids = self.vocabulary.intern(list(frequencies))
+            if len(self.vocabulary) > len(self.counts):
+                grown = np.zeros(max(len(self.vocabulary), 2 * len(self.counts)), dtype=np.int64)
+                grown[:len(self.counts)] = self.counts
+                self.counts = grown
+            counts = np.fromiter(frequencies.values(), dtype=np.int64, count=len(frequencies))
+            self.counts[ids] += counts
+        self.profiler.count('tokens', int(counts.sum()))
+
+    def flush(self):
+        pass
+
+    def result(self):
+        return dict(zip(self.vocabulary.tokens, self.counts[:len(self.vocabulary)].tolist()))
+
+    @staticmethod
+    def merge(frequencies, other):
+        if len(frequencies) < len(other):
+            frequencies, other = other, frequencies
+        for token, count in other.items():
+            frequencies[token] = frequencies.get(token, 0) + count
+        return frequencies
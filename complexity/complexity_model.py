@@ -3,118 +3,120 @@
 #
 
 import numpy as np
+import collections
+import itertools
 import multiprocessing
 import pickle
-import traceback
-from pathlib import Path
 import os
+import functools
+import time
 
 from . import utils
+from . import scoring
+from . import parallel
+from . import profiling
+from .distributions import DistributionStore, REDUCED_TOKEN
+from .accumulators import DistributionAccumulator
+from .sketch import LogQuantizer
+from .spec import resolve
+from .token_cache import TokenCache
 
 
 class ComplexityModel:
     """
     :Description: Complexity Model class, used to fit and estimate cognitive complexity scores
-    :param tokenizer: instance of Tokenizer class to split the texts into tokens
-    :type tokenizer: Tokenizer
+    :param tokenizer: instance of Tokenizer class to split the texts into tokens, or its :class:`Spec`.
+     Worker processes build the tokenizer from the spec themselves instead of receiving a pickled copy
+    :type tokenizer: Tokenizer or Spec
     :param complexity_function: instance of ComplexityFunction class to estimate a
-     complexity score for the single token
-    :type complexity_function: ComplexityFunction
+     complexity score for the single token, or its :class:`Spec`
+    :type complexity_function: ComplexityFunction or Spec
     :param alphabet: ``full`` if the distributions are counted for each token (distance-based models),
      ``reduced`` if there only distribution is counted over all tokens (counter-based models), defaults to ``full``.
     :type alphabet: str, optional
+    :param start_method: ``multiprocessing`` start method of the fit and predict workers, ``fork``, ``spawn`` or
+     ``forkserver``, defaults to the platform default
+    :type start_method: str, optional
+    :param token_cache: path to the directory of the on-disk cache of tokenized documents. If set, ``fit`` and
+     ``predict`` take the tokens of the documents seen before with the same tokenizer and preprocessing flags from
+     the cache instead of tokenizing them again, see :class:`TokenCache`, defaults to None
+    :type token_cache: str, optional
+    :param relative_accuracy: if set, the scores are quantized to logarithmic buckets before they are counted, so
+     the size of the distributions and the fit memory are bounded regardless of the size of the reference
+     collection. The quantiles of dense distributions differ from the exact ones by at most about
+     ``3 * relative_accuracy`` relatively, see :class:`LogQuantizer` for the bound. The scores of the predicted
+     texts are quantized the same way before they are compared with the quantiles. As with the exact
+     distributions, a token whose largest score (here, bucket) holds more than ``1 - gamma`` of its occurrences
+     gets the ``1e18`` quantile and is never complex, and merging the close scores into one bucket makes this
+     more likely for the tokens with few distinct scores. Exact distributions are counted if None, defaults to
+     None
+    :type relative_accuracy: float, optional
     """
-    def __init__(self, tokenizer, complexity_function, alphabet='full'):
+    def __init__(self, tokenizer, complexity_function, alphabet='full', start_method=None, token_cache=None,
+                 relative_accuracy=None):
         self.tokenizer = tokenizer
         self.complexity_function = complexity_function
         self.alphabet = alphabet
-        self.distributions = {}
-        self.quantiles = {}
+        self.start_method = start_method
+        self.token_cache = token_cache
+        self.relative_accuracy = relative_accuracy
+        self.distributions = DistributionStore()
         self.min_value = np.nan
         self.min_values = {}
-        self.quantile = 0
-        self.gamma = -1
+        self.__pool = None
 
-    @staticmethod
-    def __build_distribution(reference_corpus, queue, tokenizer, complexity_function,
-                            alphabet, use_preproc, use_stem, use_lemm, check_length, check_stopwords):
-        distributions = {}
-        for file in reference_corpus:
-            try:
-                with open(file, 'r') as f:
-                    text = f.read()
-                tokens = tokenizer.tokenize(text, use_preproc=use_preproc, use_stem=use_stem,
-                                            use_lemm=use_lemm, check_length=check_length,
-                                            check_stopwords=check_stopwords)
-                complexities = complexity_function.complexity(tokens)
-                if alphabet == 'full':
-                    for token, score in zip(tokens, complexities):
-                        if token not in distributions:
-                            distributions[token] = {}
-                        if score not in distributions[token]:
-                            distributions[token][score] = 0
-                        distributions[token][score] += 1
-                elif alphabet == 'reduced':
-                    for score in complexities:
-                        if score not in distributions:
-                            distributions[score] = 0
-                        distributions[score] += 1
-            except KeyboardInterrupt:
-                break
-            except:
-                print(traceback.format_exc())
-                continue
-        queue.put(distributions)
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_ComplexityModel__pool']
+        return state
 
-    def __union_distributions(self, chunks_distributions):
-        distributions = {}
-        for chunk_distribution in chunks_distributions:
-            if self.alphabet == 'full':
-                for token in chunk_distribution:
-                    if token not in distributions:
-                        distributions[token] = chunk_distribution[token]
-                        continue
-                    for score in chunk_distribution[token]:
-                        if score not in distributions[token]:
-                            distributions[token][score] = 0
-                        distributions[token][score] += chunk_distribution[token][score]
-            elif self.alphabet == 'reduced':
-                for score in chunk_distribution:
-                    if score not in distributions:
-                        distributions[score] = chunk_distribution[score]
-                        continue
-                    distributions[score] += chunk_distribution[score]
-        return distributions
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__pool = None
 
-    @staticmethod
-    def __split_collection(reference_corpus_path, n_jobs):
-        files = [filename for filename in Path(reference_corpus_path).rglob('*.txt')]
-        chunks = np.array_split(list(files), int(n_jobs))
-        return chunks
+    def __predict_pool(self, n_jobs):
+        """
+        :Description: returns the pool of the prediction workers, started again if the number of workers or the
+         model has changed since it was started
+        """
+        state = (n_jobs, self.start_method, self.tokenizer, self.complexity_function, self.token_cache,
+                 self.alphabet, self.relative_accuracy, self.distributions)
+        if self.__pool is not None and self.__pool[0] != state:
+            self.close()
+        if self.__pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self.__pool = (state, context.Pool(n_jobs, initializer=parallel.init_predict_worker, initargs=[self]))
+        return self.__pool[1]
 
-    @staticmethod
-    def __count_quantile(distribution, gamma):
-        gamma = 1 - gamma
-        size = sum(distribution.values())
-        current_amount = 0
-        prev_score = 1e18
-        sorted_distribution = sorted(distribution.items(),
-                                     key=lambda item: item[0], reverse=True)
-        for score, amount in sorted_distribution:
-            if current_amount + amount > size * gamma:
-                return prev_score
-            prev_score = score
-            current_amount += amount
-        return sorted_distribution[-1][0]
+    def close(self):
+        """
+        :Description: stops the prediction workers kept by the model, see :meth:`predict`
+        """
+        if self.__pool is not None:
+            self.__pool[1].terminate()
+            self.__pool[1].join()
+        self.__pool = None
+
+    def __token_quantiles(self, ids, scores, gamma):
+        if self.alphabet == 'reduced':
+            return self.distributions.quantile(REDUCED_TOKEN, gamma)
+        known = ids < len(self.distributions)
+        unique_ids, inverse = np.unique(ids[known], return_inverse=True)
+        known_quantiles = self.distributions.quantiles(unique_ids, gamma)
+        quantiles = scores.astype(np.result_type(scores, known_quantiles))
+        quantiles[known] = known_quantiles[inverse]
+        return quantiles
 
-    def fit(self, reference_corpus, n_jobs=4, use_preproc=True,
-                use_stem=True, use_lemm=False, check_length=True, check_stopwords=True):
+    def fit(self, reference_corpus, n_jobs=None, use_preproc=True,
+                use_stem=True, use_lemm=False, check_length=True, check_stopwords=True, hook=None):
         """
         :Description: fits the complexity model given the reference collection
         :param reference_corpus: Path to the directory with reference collection. Directory should contain only *.txt
-         files with each file containing text of a single document
-        :type reference_corpus: str
-        :param n_jobs: Number of parallel jobs processing the reference collection, defaults to 4
+         files with each file containing text of a single document. Alternatively, an iterable (e.g. a generator) of
+         texts or ``(doc_id, text)`` pairs, which is consumed lazily while the workers process it
+        :type reference_corpus: str or iterable
+        :param n_jobs: Number of parallel jobs processing the reference collection, defaults to the number of
+         available CPUs
         :type n_jobs: int, optional
         :param use_preproc: flag indicating whether to preprocess the reference collection documents before tokenizing,
          defaults to True
@@ -131,36 +133,68 @@ class ComplexityModel:
         :param check_stopwords: flag indicating whether to filter stopwords when preprocessing the reference
          collection documents, defaults to True
         :type check_stopwords: bool, optional
+        :param hook: receiver of the per-worker progress and of the final breakdown of time by stage, e.g.
+         :class:`profiling.ProgressPrinter`. Profiling is disabled if None, defaults to None
+        :type hook: profiling.ProfileHook, optional
         """
-        processes = []
-        self.weights_min_values = {}
-        self.weights_min_value = np.nan
-        try:
-            queue = multiprocessing.Queue()
-            chunks = self.__split_collection(reference_corpus, n_jobs)
-            for chunk in chunks:
-                processes += [multiprocessing.Process(target=self.__build_distribution,
-                                                      args=[chunk, queue, self.tokenizer,
-                                                            self.complexity_function,
-                                                            self.alphabet, use_preproc, use_stem,
-                                                            use_lemm, check_length, check_stopwords])]
-                processes[-1].start()
+        self.set_distributions(self.__count_distributions(
+            reference_corpus, n_jobs, dict(use_preproc=use_preproc, use_stem=use_stem, use_lemm=use_lemm,
+                                           check_length=check_length, check_stopwords=check_stopwords), hook))
+
+    def partial_fit(self, reference_corpus, n_jobs=None, use_preproc=True,
+                    use_stem=True, use_lemm=False, check_length=True, check_stopwords=True, hook=None):
+        """
+        :Description: adds the documents of the reference collection to the distributions of the model fitted
+         before, instead of replacing them as :meth:`fit` does. The parameters are the same as of :meth:`fit` and
+         should be the same as the model was fitted with. See :meth:`merge` for the quantiles and ``min_value``
+        """
+        self.__merge_distributions(self.__count_distributions(
+            reference_corpus, n_jobs, dict(use_preproc=use_preproc, use_stem=use_stem, use_lemm=use_lemm,
+                                           check_length=check_length, check_stopwords=check_stopwords), hook))
+
+    def merge(self, other):
+        """
+        :Description: adds the distributions of the other model, e.g. fitted on another part of the reference
+         collection, to the distributions of this model. Both models should have the same tokenizer, complexity
+         function and preprocessing flags. Row ids of the tokens of this model are preserved, the precomputed
+         quantiles are counted again only for the tokens of the other model, and ``min_value`` is updated with the
+         minimum score of the other model
+        :param other: model to merge into this one
+        :type other: ComplexityModel
+        """
+        if (other.alphabet, other.relative_accuracy) != (self.alphabet, self.relative_accuracy):
+            raise ValueError('cannot merge the models with different alphabets or relative accuracies')
+        self.__merge_distributions(other.distributions)
 
-            chunk_distributions = []
-            for i in range(int(n_jobs)):
-                chunk_distributions += [queue.get()]
+    def __count_distributions(self, reference_corpus, n_jobs, tokenize_parameters, hook):
+        n_jobs = int(n_jobs) if n_jobs else parallel.default_n_jobs()
+        accumulator = DistributionAccumulator(self.tokenizer, self.complexity_function, self.alphabet,
+                                              tokenize_parameters, token_cache=self.token_cache,
+                                              relative_accuracy=self.relative_accuracy)
+        return parallel.run(parallel.plan(reference_corpus, n_jobs), accumulator, n_jobs,
+                            start_method=self.start_method, hook=hook)
 
-            for process in processes:
-                process.terminate()
+    def __merge_distributions(self, distributions):
+        self.distributions = self.distributions.merge(distributions)
+        if not np.isnan(self.min_value) and len(distributions.scores):
+            self.min_value = min(self.min_value, distributions.min_score())
 
-            self.distributions = self.__union_distributions(chunk_distributions)
-        finally:
-            for process in processes:
-                process.terminate()
+    def set_distributions(self, distributions):
+        """
+        :Description: sets the fitted distributions of the model, e.g. counted by
+         :meth:`TermFrequencyTable.counter_distributions`, and resets the values derived from the previous ones
+        :param distributions: distributions of the token complexity scores
+        :type distributions: DistributionStore
+        """
+        self.weights_min_values = {}
+        self.weights_min_value = np.nan
+        self.distributions = distributions
+        self.min_value = np.nan
 
     def predict(self, texts, gamma=0.95, weights='mean', p=1, use_preproc=True,
                 use_stem=True, use_lemm=False, check_length=True, check_stopwords=True, exp_weights=False,
-                weights_min_shift=False, normalize=False, return_token_complexities=False):
+                weights_min_shift=False, normalize=False, return_token_complexities=False, n_jobs=1,
+                batch_size=64, hook=None, max_pending_batches=4):
         """
         :Description: estimates the complexity scores of the given set of texts
         :param texts: texts to estimate complexity scores for
@@ -196,110 +230,175 @@ class ComplexityModel:
         :param return_token_complexities: flag indicating whether to return tokens complexities score along with
             the overall text complexity score, defaults to False
         :type return_token_complexities: bool, optional
+        :param n_jobs: number of worker processes to distribute the texts over. Each worker holds a copy of the model,
+            results are returned in the order of ``texts``. The pool of the workers is kept by the model and reused
+            by the next calls with the same ``n_jobs`` until the model is changed or :meth:`close` is called,
+            defaults to 1
+        :type n_jobs: int, optional
+        :param batch_size: number of texts sent to a worker at once, used if ``n_jobs`` > 1, defaults to 64
+        :type batch_size: int, optional
+        :param max_pending_batches: maximum number of batches per worker sent to the pool and not collected yet, so
+            an iterable of texts is read only as fast as the workers score it, defaults to 4
+        :type max_pending_batches: int, optional
+        :param hook: receiver of the progress after every ``batch_size`` texts and of the final breakdown of time
+         by stage. Profiling is disabled if None, defaults to None
+        :type hook: profiling.ProfileHook, optional
         """
-        if gamma != self.gamma:
-            if self.alphabet == 'full':
-                for token in self.distributions:
-                    self.quantiles[token] = self.__count_quantile(self.distributions[token], gamma)
-            elif self.alphabet == 'reduced':
-                self.quantile = self.__count_quantile(self.distributions, gamma)
-            self.gamma = gamma
-
-        if weights_min_shift:
-            if self.alphabet == 'full' and np.isnan(self.min_value):
-                self.min_value = min([min(self.distributions[token].keys()) for token in self.distributions])
-            if self.alphabet == 'reduced' and np.isnan(self.min_value):
-                self.min_value = min(self.distributions.keys())
+        if weights_min_shift and np.isnan(self.min_value):
+            self.min_value = self.distributions.min_score()
 
+        start = time.perf_counter()
         texts_complexities = []
         token_complexities = []
-        for text in texts:
-            tokens = self.tokenizer.tokenize(text, use_preproc=use_preproc, use_stem=use_stem,
-                                             use_lemm=use_lemm, check_length=check_length,
-                                             check_stopwords=check_stopwords)
-            nd = len(tokens)
-            complexities = self.complexity_function.complexity(tokens)
-                                                               
-            weight_scores = []
-            is_complex = []
-            complexity = 0
-            total_score = 0
-            for token, score in zip(tokens, complexities):
-                weight = 0
-                if weights == 'count':
-                    weight = 1
-                if weights == 'mean':
-                    weight = score / nd
-                    if weights_min_shift:
-                        weight = (score + abs(self.min_value) + 1) / nd
-                if weights == 'total':
-                    weight = score
-                    if weights_min_shift:
-                        weight = score + abs(self.min_value) + 1
+        if int(n_jobs) > 1:
+            parameters = dict(gamma=gamma, weights=weights, p=p, use_preproc=use_preproc, use_stem=use_stem,
+                              use_lemm=use_lemm, check_length=check_length, check_stopwords=check_stopwords,
+                              exp_weights=exp_weights, weights_min_shift=weights_min_shift, normalize=normalize,
+                              return_token_complexities=return_token_complexities)
+            batches = ((batch, parameters, hook is not None) for batch in utils.batches(texts, batch_size))
+            snapshots = {}
+            pool = self.__predict_pool(int(n_jobs))
+            pending = collections.deque()
+            for batch in itertools.chain(batches, [None]):
+                if batch is not None:
+                    pending.append(pool.apply_async(parallel.predict_batch, [batch]))
+                while pending and (batch is None or len(pending) >= max_pending_batches * int(n_jobs)):
+                    batch_texts_complexities, batch_token_complexities, snapshot = pending.popleft().get()
+                    texts_complexities += batch_texts_complexities
+                    token_complexities += batch_token_complexities
+                    if snapshot is not None:
+                        worker = snapshot['worker']
+                        if worker in snapshots:
+                            snapshot = dict(profiling.merge([snapshots[worker], snapshot]), worker=worker, done=False)
+                        snapshots[worker] = snapshot
+                        hook.progress(snapshot)
+            if hook is not None:
+                hook.finish(profiling.report(list(snapshots.values()), time.perf_counter() - start))
+            return texts_complexities, token_complexities
 
-                if self.alphabet == 'full':
-                    if token not in self.quantiles:
-                        current_quantile = score
-                    else:
-                        current_quantile = self.quantiles[token]
-                    if weights == 'excessive':
-                        weight = score - current_quantile
-                    if weights == 'excessive_mean':
-                        weight = (score - current_quantile) / nd
-                    if exp_weights:
-                        weight = np.tanh(weight)
-                    complexity += weight ** p * (score >= current_quantile)
-                    total_score += weight ** p
-                    is_complex += [score >= current_quantile]
-                elif self.alphabet == 'reduced':
-                    if weights == 'excessive':
-                        weight = score - self.quantile
-                    if weights == 'excessive_mean':
-                        weight = (score - self.quantile) / nd
-                    complexity += weight ** p * (score >= self.quantile)
-                    total_score += weight ** p
-                    is_complex += [score >= self.quantile]
-                weight_scores += [weight]
-            if normalize:
-                texts_complexities += [complexity / total_score]
-            else:
-                texts_complexities += [complexity]
-            if return_token_complexities:
-                token_complexities += list(zip(complexities, weight_scores, is_complex))
+        profiler = profiling.Profiler() if hook is not None else profiling.NULL_PROFILER
+        tokenize = self.tokenize_function(dict(use_preproc=use_preproc, use_stem=use_stem, use_lemm=use_lemm,
+                                               check_length=check_length, check_stopwords=check_stopwords))
+        for i, text in enumerate(texts):
+            with profiler.stage('tokenize'):
+                tokens = tokenize(text)
+            profiler.count('documents')
+            if hook is not None:
+                profiler.count('bytes', len(text.encode('utf-8')))
+            profiler.count('tokens', len(tokens))
+            with profiler.stage('score'):
+                complexity, text_token_complexities = self.predict_tokens(
+                    tokens, gamma=gamma, weights=weights, p=p, exp_weights=exp_weights,
+                    weights_min_shift=weights_min_shift, normalize=normalize,
+                    return_token_complexities=return_token_complexities)
+            texts_complexities += [complexity]
+            token_complexities += text_token_complexities
+            if hook is not None and (i + 1) % batch_size == 0:
+                hook.progress(profiler.snapshot())
+        if hook is not None:
+            hook.finish(profiling.report([profiler.snapshot(done=True)], time.perf_counter() - start))
         return texts_complexities, token_complexities
 
-    def dump(self, path='.', model_name='complexity-model'):
+    def tokenize_function(self, tokenize_parameters):
+        """
+        :Description: returns the function tokenizing a text with the tokenizer of the model, through the token
+         cache if the model has one
+        :param tokenize_parameters: preprocessing flags passed to ``tokenize``
+        :type tokenize_parameters: dict
+        """
+        tokenizer = resolve(self.tokenizer)
+        if self.token_cache is not None:
+            return TokenCache(self.token_cache, tokenizer, tokenize_parameters).tokenize
+        return functools.partial(tokenizer.tokenize, **tokenize_parameters)
+
+    def predict_tokens(self, tokens, gamma=0.95, weights='mean', p=1, exp_weights=False, weights_min_shift=False,
+                       normalize=False, return_token_complexities=False):
+        """
+        :Description: estimates the complexity score of a single text given its tokens, e.g. shared by several
+         models with the same tokenizer. The parameters are the same as of :meth:`predict`
+        :param tokens: output of the tokenizer of the model
+        :type tokens: list
+        """
+        if weights_min_shift and np.isnan(self.min_value):
+            self.min_value = self.distributions.min_score()
+
+        complexity_function = resolve(self.complexity_function)
+        ids = None
+        if self.alphabet == 'full':
+            ids = self.distributions.ids(tokens, intern_unknown=True)
+        if ids is not None and getattr(complexity_function, 'accepts_ids', False):
+            complexities = complexity_function.complexity(ids)
+        else:
+            complexities = complexity_function.complexity(tokens)
+        scores = np.asarray(complexities)
+        quantiles = self.__token_quantiles(ids, scores, gamma)
+        compared_scores = scores
+        if self.relative_accuracy is not None:
+            compared_scores = LogQuantizer(self.relative_accuracy).quantize(scores)
+            if ids is not None:
+                compared_scores = np.where(ids < len(self.distributions), compared_scores, scores)
+        complexity, total_score, weight_scores, is_complex = scoring.score_text(
+            scores, quantiles, weights=weights, p=p, min_value=self.min_value,
+            exp_weights=exp_weights and self.alphabet == 'full', weights_min_shift=weights_min_shift,
+            compared_scores=compared_scores)
+        if normalize:
+            complexity = complexity / total_score
+        if isinstance(complexity, np.generic):
+            complexity = complexity.item()
+        token_complexities = []
+        if return_token_complexities:
+            if isinstance(complexities, np.ndarray):
+                complexities = complexities.tolist()
+            token_complexities = list(zip(complexities, weight_scores.tolist(), is_complex.tolist()))
+        return complexity, token_complexities
+
+    def dump(self, path='.', model_name='complexity-model', gammas=(0.95,)):
         """
-        :Description: dumps the fitted complexity model
+        :Description: dumps the fitted complexity model. Distributions are saved as flat ``.npy`` arrays,
+         which are memory-mapped when the model is loaded
         :param path: path to save the dump to, defaults to ``.``
         :type path: str, optional
         :param model_name: name of the dump directory, defaults to ``complexity-model``
         :type model_name: str, optional
+        :param gammas: quantile indicators to precompute the quantiles of all tokens for, defaults to ``(0.95,)``
+        :type gammas: tuple, optional
         """
         fullpath = os.path.join(path, model_name)
         utils.create_folder(fullpath)
-        parameters = {'alphabet': self.alphabet, 'gamma': self.gamma,
-                      'distributions': self.distributions, 'quantiles': self.quantiles,
-                      'quantile': self.quantile}
+        for gamma in gammas:
+            self.distributions.precompute(gamma)
+        self.distributions.save(fullpath)
+        parameters = {'alphabet': self.alphabet, 'relative_accuracy': self.relative_accuracy}
         parameters_path = os.path.join(fullpath, 'parameters.bin')
         pickle.dump(parameters, open(parameters_path, 'wb'))
 
     @staticmethod
-    def load(path, tokenizer, complexity_function):
+    def load(path, tokenizer, complexity_function, mmap=True):
         """
-        :Description: loads the instance from the dump directory
-        :param path: path to the dump
+        :Description: loads the instance from the dump directory. Dumps of the previous format, a single pickled
+         ``parameters.bin`` file, are loaded as well
+        :param path: path to the dump directory or to its ``parameters.bin`` file
         :type path: str
         :param tokenizer: instance of Tokenizer class, used for fitting the model
         :type tokenizer: Tokenizer
         :param complexity_function: instance of ComplexityFunction class, used for fitting the model
         :type complexity_function: ComplexityFunction
+        :param mmap: flag indicating whether to memory-map the distributions instead of reading them,
+         defaults to True
+        :type mmap: bool, optional
         """
+        if os.path.isdir(path):
+            path = os.path.join(path, 'parameters.bin')
         model = pickle.load(open(path, 'rb'))
         instance = ComplexityModel(tokenizer, complexity_function,
-                                   alphabet=model['alphabet'])
-        instance.distributions = model['distributions']
-        instance.gamma = model['gamma']
-        instance.quantile = model['quantile']
-        instance.quantiles = model['quantiles']
+                                   alphabet=model['alphabet'], relative_accuracy=model.get('relative_accuracy'))
+        if 'distributions' not in model:
+            instance.distributions = DistributionStore.load(os.path.dirname(path), mmap=mmap)
+            return instance
+        distributions = model['distributions']
+        if isinstance(distributions, dict):
+            if instance.alphabet == 'reduced':
+                distributions = {REDUCED_TOKEN: distributions}
+            distributions = DistributionStore.from_dict(distributions)
+        instance.distributions = distributions
         return instance
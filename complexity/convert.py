@@ -0,0 +1,47 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+
+from .complexity_model import ComplexityModel
+from .sketch import LogQuantizer
+
+
+def convert(source, path='.', model_name='complexity-model', gammas=(0.95,), relative_accuracy=None):
+    """
+    :Description: converts the pickled dump of the previous format into the memory-mappable dump. Dumps of the
+     current format are accepted as well, e.g. to compact their distributions
+    :param source: path to the pickled ``parameters.bin`` file or to the directory containing it
+    :type source: str
+    :param path: path to save the converted dump to, defaults to ``.``
+    :type path: str, optional
+    :param model_name: name of the converted dump directory, defaults to ``complexity-model``
+    :type model_name: str, optional
+    :param gammas: quantile indicators to precompute the quantiles for, defaults to ``(0.95,)``
+    :type gammas: tuple, optional
+    :param relative_accuracy: if set, the scores of the distributions are quantized with the
+     :class:`LogQuantizer` of this relative accuracy, defaults to None
+    :type relative_accuracy: float, optional
+    """
+    model = ComplexityModel.load(source, None, None, mmap=False)
+    if relative_accuracy is not None:
+        model.distributions = LogQuantizer(relative_accuracy).compact(model.distributions)
+        model.relative_accuracy = relative_accuracy
+    model.dump(path=path, model_name=model_name, gammas=gammas)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', nargs='*', help='path to the pickled dump')
+    parser.add_argument('-p', '--path', nargs='*', default=['.'], help='path to save the converted dump to')
+    parser.add_argument('-n', '--name', nargs='*', help='name of the converted model')
+    parser.add_argument('-g', '--gammas', nargs='*', type=float, default=[0.95],
+                        help='quantile indicators to precompute')
+    parser.add_argument('-a', '--accuracy', nargs='*', type=float, default=[None],
+                        help='relative accuracy of the quantized distributions, exact if omitted')
+    args = parser.parse_args()
+
+    convert(args.input[0], path=args.path[0], model_name=args.name[0], gammas=tuple(args.gammas),
+            relative_accuracy=args.accuracy[0])
@@ -0,0 +1,291 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+import collections
+import gzip
+import io
+import json
+import mmap
+import os
+import tarfile
+from pathlib import Path
+
+JSONL_SUFFIXES = ('.jsonl', '.jsonl.gz', '.jsonl.zst')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.zst')
+READ_BUFFER_SIZE = 1 << 20
+
+Shard = collections.namedtuple('Shard', ['path', 'start', 'end'])
+Shard.__doc__ = """
+:Description: part of a packed corpus file processed as a single task. Uncompressed JSONL files are split into byte
+ ranges ``[start, end)`` holding the lines starting inside the range, compressed files and tar archives are streamed
+ as a whole with ``start = 0`` and ``end = None``
+"""
+
+
+def is_packed(path):
+    return str(path).endswith(JSONL_SUFFIXES + TAR_SUFFIXES)
+
+
+def packed_files(path):
+    """
+    :Description: returns the packed corpus files of the directory, or the path itself if it is a packed file
+    :param path: path to the directory or to the file
+    :type path: str
+    """
+    if not os.path.isdir(path):
+        return [str(path)] if is_packed(path) else []
+    return sorted(str(filename) for filename in Path(path).rglob('*') if filename.is_file() and is_packed(filename))
+
+
+def plan_shards(path, n_jobs, shards_per_job=16, min_shard_size=1 << 20, max_shard_size=1 << 26):
+    """
+    :Description: splits the packed corpus files into shards of roughly equal size, ordered from the largest to
+     the smallest. Uncompressed JSONL files are split into byte ranges, so that several workers share a single large
+     file, the other files make one shard each
+    :param path: path to the directory with the packed files or to a single packed file
+    :type path: str
+    :param n_jobs: number of workers processing the shards
+    :type n_jobs: int
+    :param shards_per_job: approximate number of shards per worker, defaults to 16
+    :type shards_per_job: int, optional
+    :param min_shard_size: minimum size of a byte range in bytes, defaults to 1 MiB
+    :type min_shard_size: int, optional
+    :param max_shard_size: maximum size of a byte range in bytes, defaults to 64 MiB
+    :type max_shard_size: int, optional
+    """
+    files = [(os.path.getsize(filename), filename) for filename in packed_files(path)]
+    total_size = sum(size for size, _ in files)
+    shard_size = int(min(max(total_size / max(int(n_jobs) * shards_per_job, 1), min_shard_size), max_shard_size))
+
+    shards = []
+    for size, filename in files:
+        if filename.endswith('.jsonl'):
+            shards += [(min(shard_size, size - start), Shard(filename, start, min(start + shard_size, size)))
+                       for start in range(0, size, shard_size)]
+        else:
+            shards += [(size, Shard(filename, 0, None))]
+    shards.sort(key=lambda shard: -shard[0])
+    return [shard for _, shard in shards]
+
+
+def open_stream(path):
+    """
+    :Description: opens the file for sequential binary reading with a large buffer, decompressing ``.gz``,
+     ``.tgz`` and ``.zst`` files. Reading ``.zst`` files requires the ``zstandard`` package
+    :param path: path to the file
+    :type path: str
+    """
+    raw = open(path, 'rb', buffering=READ_BUFFER_SIZE)
+    if path.endswith(('.gz', '.tgz')):
+        return gzip.GzipFile(fileobj=raw)
+    if path.endswith('.zst'):
+        import zstandard
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_size=READ_BUFFER_SIZE,
+                                                                            closefd=True),
+                                 buffer_size=READ_BUFFER_SIZE)
+    return raw
+
+
+def parse_line(line, default_id):
+    """
+    :Description: returns the ``(doc_id, text)`` pair of a JSONL line holding either a string or an object with the
+     ``text`` and optional ``id`` fields, None for a blank line
+    """
+    if not line.strip():
+        return None
+    document = json.loads(line)
+    if isinstance(document, str):
+        return default_id, document
+    return document.get('id', default_id), document['text']
+
+
+def parse_lines(path, lines, on_error=None):
+    """
+    :Description: iterates over the documents of the ``(position, line)`` pairs of the JSONL file. A line failing
+     to decode or to parse is passed to ``on_error`` with its id and the exception and skipped, so it costs a
+     single document. The exception is raised if ``on_error`` is None
+    """
+    for position, line in lines:
+        default_id = '{}:{}'.format(path, position)
+        try:
+            document = parse_line(line, default_id)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(default_id, e)
+            continue
+        if document is not None:
+            yield document
+
+
+def jsonl_range_lines(path, start, end):
+    """
+    :Description: iterates over the ``(position, line)`` pairs of the lines starting inside the byte range of the
+     uncompressed JSONL file, memory-mapping the file
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = start
+            if start > 0 and mm[start - 1:start] != b'\n':
+                position = mm.find(b'\n', start)
+                position = len(mm) if position < 0 else position + 1
+            while position < end:
+                line_end = mm.find(b'\n', position)
+                line_end = len(mm) if line_end < 0 else line_end
+                yield position, mm[position:line_end]
+                position = line_end + 1
+
+
+def jsonl_lines(path):
+    with open_stream(path) as f:
+        position = 0
+        for line in f:
+            yield position, line
+            position += len(line)
+
+
+def iter_jsonl(path, on_error=None):
+    return parse_lines(path, jsonl_lines(path), on_error)
+
+
+def iter_tar(path, on_error=None):
+    with open_stream(path) as f:
+        with tarfile.open(fileobj=f, mode='r|') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                try:
+                    text = archive.extractfile(member).read().decode('utf-8')
+                except UnicodeDecodeError as e:
+                    if on_error is None:
+                        raise
+                    on_error(member.name, e)
+                    continue
+                yield member.name, text
+
+
+def read_shard(shard, on_error=None):
+    """
+    :Description: lazily iterates over the ``(doc_id, text)`` pairs of the documents of the shard, so that only a
+     single document of a large file is held in memory at once
+    :param shard: shard of a packed corpus file
+    :type shard: Shard
+    :param on_error: function called with the id and the exception of a document failing to decode or to parse,
+     which is skipped then. If None, the exception is raised, defaults to None
+    :type on_error: callable, optional
+    """
+    if shard.path.endswith(TAR_SUFFIXES):
+        return iter_tar(shard.path, on_error)
+    if shard.end is not None:
+        return parse_lines(shard.path, jsonl_range_lines(shard.path, shard.start, shard.end), on_error)
+    return iter_jsonl(shard.path, on_error)
+
+
+def read_task(task, on_error=None):
+    """
+    :Description: lazily iterates over the ``(doc_id, text)`` pairs of the documents of a task of a fit batch: a
+     path to a text file, a ``(doc_id, text)`` pair or a :class:`Shard`. See :func:`read_shard` for ``on_error``
+    """
+    if isinstance(task, Shard):
+        return read_shard(task, on_error)
+    if isinstance(task, tuple):
+        return iter([task])
+    return read_text_file(task)
+
+
+def read_text_file(path):
+    with open(path, 'r') as f:
+        yield path, f.read()
+
+
+def read_corpus(path):
+    """
+    :Description: iterates over the ``(doc_id, text)`` pairs of the reference collection: ``.txt`` files and packed
+     files of the directory, or a single packed file, e.g. to pass the texts to ``predict``
+    :param path: path to the directory or to the packed file
+    :type path: str
+    """
+    if os.path.isdir(path):
+        for filename in sorted(Path(path).rglob('*.txt')):
+            yield from read_task(str(filename))
+    for filename in packed_files(path):
+        if filename.endswith(TAR_SUFFIXES):
+            yield from iter_tar(filename)
+        else:
+            yield from iter_jsonl(filename)
+
+
+def open_writer(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wb')
+    if path.endswith('.zst'):
+        import zstandard
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, 'wb', buffering=READ_BUFFER_SIZE)
+
+
+def pack(source, output, packing='jsonl', compression=None, shard_size=1 << 28):
+    """
+    :Description: packs the ``.txt`` files of the directory into JSONL or tar shards of about ``shard_size``
+     uncompressed bytes each, named ``part-00000.jsonl``, ``part-00001.jsonl``, etc. Paths of the files relative to
+     the directory are kept as the ids of the documents
+    :param source: path to the directory with the ``.txt`` files
+    :type source: str
+    :param output: path to the directory to save the shards to
+    :type output: str
+    :param packing: ``jsonl`` or ``tar``, defaults to ``jsonl``
+    :type packing: str, optional
+    :param compression: ``gz``, ``zst`` or None, defaults to None
+    :type compression: str, optional
+    :param shard_size: approximate size of the shard in bytes before compression, defaults to 256 MiB
+    :type shard_size: int, optional
+    """
+    os.makedirs(output, exist_ok=True)
+    suffix = '.' + packing + ('.' + compression if compression else '')
+    writer, archive, written, shards = None, None, 0, 0
+    try:
+        for filename in sorted(Path(source).rglob('*.txt')):
+            if writer is None or written >= shard_size:
+                if archive is not None:
+                    archive.close()
+                if writer is not None:
+                    writer.close()
+                writer = open_writer(os.path.join(output, 'part-{:05d}{}'.format(shards, suffix)))
+                archive = tarfile.open(fileobj=writer, mode='w|') if packing == 'tar' else None
+                written, shards = 0, shards + 1
+            name = str(filename.relative_to(source))
+            with open(filename, 'r') as f:
+                data = f.read().encode('utf-8')
+            if archive is not None:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+            else:
+                data = (json.dumps(dict(id=name, text=data.decode('utf-8')), ensure_ascii=False) + '\n').encode('utf-8')
+                writer.write(data)
+            written += len(data)
+    finally:
+        if archive is not None:
+            archive.close()
+        if writer is not None:
+            writer.close()
+    return shards
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', nargs='*', help='path to the directory with the .txt files')
+    parser.add_argument('-o', '--output', nargs='*', help='path to the directory to save the shards to')
+    parser.add_argument('-f', '--format', nargs='*', default=['jsonl'], help='jsonl or tar, defaults to jsonl')
+    parser.add_argument('-c', '--compression', nargs='*', default=[None], help='gz or zst, uncompressed if omitted')
+    parser.add_argument('-s', '--shard-size', nargs='*', type=int, default=[256],
+                        help='size of the shard in MiB before compression')
+    args = parser.parse_args()
+
+    pack(args.input[0], args.output[0], packing=args.format[0], compression=args.compression[0],
+         shard_size=args.shard_size[0] << 20)
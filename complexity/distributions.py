@@ -0,0 +1,312 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+import pickle
+import os
+
+from storage.arrays import save_array
+
+from .vocabulary import PooledVocabulary, Vocabulary
+
+
+REDUCED_TOKEN = None
+
+
+class DistributionStore:
+    """
+    :Description: Compact storage of the empirical score distributions. Each token is mapped to a row id by the
+     vocabulary, scores and counts of all rows are kept in flat arrays (CSR layout) sorted by score within each row
+    :param tokens: tokens in the order of their row ids
+    :type tokens: list or Vocabulary
+    :param offsets: array of ``len(tokens) + 1`` row boundaries in ``scores`` and ``counts``
+    :type offsets: np.ndarray, optional
+    :param scores: distinct scores of all rows, sorted in ascending order within each row
+    :type scores: np.ndarray, optional
+    :param counts: number of occurrences of each score
+    :type counts: np.ndarray, optional
+    :param tails: sums of counts of the scores greater or equal to each score within its row, counted from
+     ``offsets`` and ``counts`` if not provided
+    :type tails: np.ndarray, optional
+    """
+    ARRAYS = ('offsets', 'scores', 'counts', 'tails')
+
+    def __init__(self, tokens=(), offsets=None, scores=None, counts=None, tails=None):
+        self.vocabulary = tokens if isinstance(tokens, Vocabulary) else Vocabulary(tokens)
+        self.tokens = self.vocabulary.tokens
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        self.scores = np.zeros(0, dtype=np.int64) if scores is None else scores
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+        self.tails = self.__count_tails(self.offsets, self.counts) if tails is None else tails
+        self.precomputed = {}
+        self.path = None
+
+    @staticmethod
+    def __count_tails(offsets, counts):
+        cumulative = np.cumsum(counts)
+        lengths = np.diff(offsets)
+        row_ends = np.repeat(offsets[1:] - 1, lengths)
+        return cumulative[row_ends] - cumulative + counts
+
+    @staticmethod
+    def from_dict(distributions):
+        """
+        :Description: builds the store from the ``token -> {score: count}`` mapping
+        :param distributions: nested dictionary of distributions
+        :type distributions: dict
+        """
+        tokens = list(distributions.keys())
+        lengths = np.fromiter((len(distributions[token]) for token in tokens), dtype=np.int64, count=len(tokens))
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        scores = np.asarray([score for token in tokens for score in distributions[token]])
+        if scores.size == 0:
+            scores = scores.astype(np.int64)
+        elif scores.dtype == object:
+            scores = scores.astype(np.float64)
+        counts = np.fromiter((count for token in tokens for count in distributions[token].values()),
+                             dtype=np.int64, count=int(offsets[-1]))
+
+        rows = np.repeat(np.arange(len(tokens), dtype=np.int64), lengths)
+        order = np.lexsort((scores, rows))
+        return DistributionStore(tokens, offsets, scores[order], counts[order])
+
+    @staticmethod
+    def from_ids(tokens, ids, scores):
+        """
+        :Description: builds the store from the flat arrays of token ids and scores of their occurrences. Rows are
+         created for the ids present in ``ids`` only, in the ascending order of the ids
+        :param tokens: tokens by their ids, e.g. :class:`Vocabulary`
+        :type tokens: list or Vocabulary
+        :param ids: ids of the tokens of all occurrences
+        :type ids: np.ndarray
+        :param scores: scores of all occurrences
+        :type scores: np.ndarray
+        """
+        order = np.lexsort((scores, ids))
+        ids, scores = ids[order], scores[order]
+        starts = np.ones(len(ids), dtype=bool)
+        starts[1:] = (ids[1:] != ids[:-1]) | (scores[1:] != scores[:-1])
+        starts = np.flatnonzero(starts)
+        counts = np.diff(np.append(starts, len(ids)))
+        row_tokens, rows = np.unique(ids[starts], return_inverse=True)
+        offsets = np.zeros(len(row_tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(row_tokens)), out=offsets[1:])
+        return DistributionStore([tokens[i] for i in row_tokens.tolist()], offsets, scores[starts], counts)
+
+    def merge(self, other):
+        """
+        :Description: returns the store with the distributions of both stores summed up. Row ids of this store are
+         preserved, tokens present only in ``other`` are appended in their order. Precomputed quantiles of this store
+         are carried over, only the ones of the rows of ``other`` are counted again
+        :param other: store to merge with
+        :type other: DistributionStore
+        """
+        other_tokens = list(other.tokens)
+        other_ids = self.ids(other_tokens)
+        new = np.flatnonzero(other_ids < 0)
+        tokens = list(self.tokens) + [other_tokens[i] for i in new.tolist()]
+        other_ids[new] = np.arange(len(self.tokens), len(tokens))
+
+        rows = np.concatenate([np.repeat(np.arange(len(self.tokens), dtype=np.int64), np.diff(self.offsets)),
+                               np.repeat(other_ids, np.diff(other.offsets))])
+        scores = np.concatenate([self.scores, other.scores])
+        counts = np.concatenate([self.counts, other.counts])
+        order = np.lexsort((scores, rows))
+        rows, scores, counts = rows[order], scores[order], counts[order]
+
+        starts = np.ones(len(rows), dtype=bool)
+        starts[1:] = (rows[1:] != rows[:-1]) | (scores[1:] != scores[:-1])
+        starts = np.flatnonzero(starts)
+        counts = np.add.reduceat(counts, starts) if len(starts) else counts
+        rows, scores = rows[starts], scores[starts]
+
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(tokens)), out=offsets[1:])
+        store = DistributionStore(tokens, offsets, scores, counts)
+        for gamma, quantiles in self.precomputed.items():
+            changed = np.unique(other_ids)
+            changed_quantiles = store.quantiles(changed, gamma)
+            store.precomputed[gamma] = np.empty(len(tokens), dtype=np.result_type(quantiles, changed_quantiles))
+            store.precomputed[gamma][:len(self.tokens)] = quantiles
+            store.precomputed[gamma][changed] = changed_quantiles
+        return store
+
+    def to_dict(self):
+        """
+        :Description: converts the store back to the ``token -> {score: count}`` mapping
+        """
+        return {token: dict(zip(*(array.tolist() for array in self.row(token)))) for token in self.tokens}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token):
+        return token in self.vocabulary
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __getstate__(self):
+        """
+        :Description: a store memory-mapped by :meth:`load` is pickled as the path to its directory, so the workers
+         map the same files instead of receiving copies of the arrays. Quantiles precomputed after the load are
+         pickled along with it
+        """
+        if self.path is not None:
+            precomputed = {gamma: quantiles for gamma, quantiles in self.precomputed.items()
+                           if not isinstance(quantiles, np.memmap)}
+            return {'path': self.path, 'precomputed': precomputed}
+        return {'tokens': list(self.tokens), 'offsets': self.offsets, 'scores': self.scores, 'counts': self.counts,
+                'tails': self.tails, 'precomputed': self.precomputed}
+
+    def __setstate__(self, state):
+        if 'path' in state:
+            self.__dict__.update(DistributionStore.load(state['path']).__dict__)
+        else:
+            self.__init__(state['tokens'], state['offsets'], state['scores'], state['counts'], state.get('tails'))
+        self.precomputed.update(state.get('precomputed', {}))
+
+    def __row_id(self, token):
+        row_id = self.vocabulary.find([token])[0]
+        if row_id < 0:
+            raise KeyError(token)
+        return row_id
+
+    def row(self, token):
+        """
+        :Description: returns scores and counts of the token distribution
+        :param token: token to get the distribution for
+        :type token: hashable
+        """
+        row_id = self.__row_id(token)
+        start, end = self.offsets[row_id], self.offsets[row_id + 1]
+        return self.scores[start:end], self.counts[start:end]
+
+    def min_score(self):
+        """
+        :Description: returns the minimum score over all distributions
+        """
+        return self.scores.min().item()
+
+    def ids(self, tokens, intern_unknown=False):
+        """
+        :Description: maps the tokens to row ids, see :meth:`Vocabulary.ids`
+        :param tokens: tokens to map
+        :type tokens: list
+        :param intern_unknown: flag indicating whether to give the tokens absent in the store temporary ids
+         greater or equal to ``len(store)`` instead of ``-1``, defaults to False
+        :type intern_unknown: bool, optional
+        """
+        return self.vocabulary.ids(tokens, intern_unknown=intern_unknown)
+
+    def quantiles(self, row_ids, gamma):
+        """
+        :Description: counts the gamma-quantiles of the given rows. The quantile is the smallest score such that
+         the share of strictly greater scores does not exceed ``1 - gamma``, ``1e18`` if there is no such score.
+         The position of the quantile is found by the binary search over the tail sums of counts, which are
+         non-increasing within each row
+        :param row_ids: ids of the rows to count the quantiles for
+        :type row_ids: np.ndarray
+        :param gamma: quantile indicator
+        :type gamma: float
+        """
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if gamma in self.precomputed:
+            return self.precomputed[gamma][row_ids]
+        starts = self.offsets[row_ids]
+        ends = self.offsets[row_ids + 1]
+        thresholds = self.tails[starts] * (1 - gamma)
+        low, high = starts.copy(), ends.copy()
+        active = low < high
+        while active.any():
+            middle = (low + high) // 2
+            greater = self.tails[np.minimum(middle, len(self.tails) - 1)] > thresholds
+            low = np.where(active & greater, middle + 1, low)
+            high = np.where(active & ~greater, middle, high)
+            active = low < high
+        quantiles = self.scores[np.minimum(low, ends - 1)]
+        if (low == ends).any():
+            quantiles = quantiles.astype(np.float64)
+            quantiles[low == ends] = 1e18
+        return quantiles
+
+    def quantile(self, token, gamma):
+        """
+        :Description: counts the gamma-quantile of the token distribution
+        :param token: token to count the quantile for
+        :type token: hashable
+        :param gamma: quantile indicator
+        :type gamma: float
+        """
+        return self.quantiles([self.__row_id(token)], gamma)[0].item()
+
+    def precompute(self, gamma):
+        """
+        :Description: counts the gamma-quantiles of all rows, so they are looked up instead of searched for
+        :param gamma: quantile indicator
+        :type gamma: float
+        """
+        if gamma not in self.precomputed:
+            self.precomputed[gamma] = self.quantiles(np.arange(len(self.tokens)), gamma)
+        return self.precomputed[gamma]
+
+    def save(self, path):
+        """
+        :Description: saves the store into the directory as flat ``.npy`` arrays, which can be memory-mapped by
+         :meth:`load`. A vocabulary of strings is saved as a :class:`PooledVocabulary`, any other one, e.g. the
+         ``reduced`` one, is pickled into ``tokens.bin``
+        :param path: path to the directory
+        :type path: str
+        """
+        vocabulary = self.vocabulary
+        if not isinstance(vocabulary, PooledVocabulary) and all(isinstance(token, str) for token in self.tokens):
+            try:
+                vocabulary = PooledVocabulary.build(self.tokens)
+            except (UnicodeEncodeError, ValueError):
+                pass
+        if isinstance(vocabulary, PooledVocabulary):
+            vocabulary.save(path, 'tokens')
+            if os.path.exists(os.path.join(path, 'tokens.bin')):
+                os.remove(os.path.join(path, 'tokens.bin'))
+        else:
+            with open(os.path.join(path, 'tokens.bin'), 'wb') as f:
+                pickle.dump(list(self.tokens), f, protocol=pickle.HIGHEST_PROTOCOL)
+        for name in self.ARRAYS:
+            save_array(os.path.join(path, name + '.npy'), getattr(self, name))
+        gammas = sorted(self.precomputed)
+        with open(os.path.join(path, 'gammas.bin'), 'wb') as f:
+            pickle.dump(gammas, f)
+        for i, gamma in enumerate(gammas):
+            save_array(os.path.join(path, 'quantiles-{}.npy'.format(i)), self.precomputed[gamma])
+
+    @staticmethod
+    def load(path, mmap=True):
+        """
+        :Description: loads the store saved by :meth:`save`, including the stores saved with the pickled
+         vocabulary only. With ``mmap`` the arrays and the pooled vocabulary are memory-mapped read-only, so
+         processes opening the same store share its pages through the OS page cache
+        :param path: path to the directory
+        :type path: str
+        :param mmap: flag indicating whether to memory-map the arrays instead of reading them, defaults to True
+        :type mmap: bool, optional
+        """
+        mmap_mode = 'r' if mmap else None
+        if os.path.exists(os.path.join(path, 'tokens.bin')):
+            with open(os.path.join(path, 'tokens.bin'), 'rb') as f:
+                tokens = pickle.load(f)
+        else:
+            tokens = PooledVocabulary.load(path, 'tokens', mmap=mmap)
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                  for name in DistributionStore.ARRAYS}
+        store = DistributionStore(tokens, **arrays)
+        with open(os.path.join(path, 'gammas.bin'), 'rb') as f:
+            gammas = pickle.load(f)
+        for i, gamma in enumerate(gammas):
+            store.precomputed[gamma] = np.load(os.path.join(path, 'quantiles-{}.npy'.format(i)),
+                                               mmap_mode=mmap_mode)
+        if mmap:
+            store.path = os.path.abspath(path)
+        return store
@@ -0,0 +1,95 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import asyncio
+import argparse
+import json
+import time
+
+import numpy as np
+
+
+async def request(host, port, method, target, payload=None):
+    """
+    :Description: sends a single HTTP request to the scoring server and returns the decoded json response
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write('{} {} HTTP/1.1\r\nHost: {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                 'Connection: close\r\n\r\n'.format(method, target, host, len(body)).encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b' ', 2)[1])
+    return status, json.loads(response.split(b'\r\n\r\n', 1)[1].decode('utf-8'))
+
+
+async def load_test(host, port, model, texts, n_requests=1000, concurrency=32, texts_per_request=1,
+                    parameters=None):
+    """
+    :Description: sends ``n_requests`` prediction requests with at most ``concurrency`` of them in flight
+     and measures throughput and latency
+    :param host: host of the scoring server
+    :type host: str
+    :param port: port of the scoring server
+    :type port: int
+    :param model: name of the model to request
+    :type model: str
+    :param texts: texts to cycle through
+    :type texts: list[str]
+    :param n_requests: total number of requests, defaults to 1000
+    :type n_requests: int, optional
+    :param concurrency: maximum number of requests in flight, defaults to 32
+    :type concurrency: int, optional
+    :param texts_per_request: number of texts in a request, defaults to 1
+    :type texts_per_request: int, optional
+    :param parameters: parameters of :meth:`ComplexityModel.predict`, defaults to None
+    :type parameters: dict, optional
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def send(i):
+        nonlocal errors
+        batch = [texts[(i * texts_per_request + j) % len(texts)] for j in range(texts_per_request)]
+        async with semaphore:
+            started = time.monotonic()
+            status, _ = await request(host, port, 'POST', '/predict',
+                                      {'model': model, 'texts': batch, 'parameters': parameters or {}})
+            latencies.append(time.monotonic() - started)
+            errors += status != 200
+
+    started = time.monotonic()
+    await asyncio.gather(*(send(i) for i in range(n_requests)))
+    elapsed = time.monotonic() - started
+    _, server_stats = await request(host, port, 'GET', '/stats')
+    return {'requests': n_requests, 'errors': errors, 'elapsed': elapsed,
+            'requests_per_second': n_requests / elapsed,
+            'texts_per_second': n_requests * texts_per_request / elapsed,
+            'latency_p50': float(np.percentile(latencies, 50)),
+            'latency_p95': float(np.percentile(latencies, 95)),
+            'latency_p99': float(np.percentile(latencies, 99)),
+            'server': server_stats}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--model', nargs='*', help='name of the model to request')
+    parser.add_argument('-t', '--texts', nargs='*', help='paths to the text files to send')
+    parser.add_argument('-H', '--host', nargs='*', default=['127.0.0.1'], help='host of the scoring server')
+    parser.add_argument('-P', '--port', nargs='*', type=int, default=[8000], help='port of the scoring server')
+    parser.add_argument('-r', '--requests', nargs='*', type=int, default=[1000], help='number of requests')
+    parser.add_argument('-c', '--concurrency', nargs='*', type=int, default=[32], help='requests in flight')
+    parser.add_argument('-b', '--batch', nargs='*', type=int, default=[1], help='texts per request')
+    args = parser.parse_args()
+
+    texts = []
+    for path in args.texts:
+        with open(path, 'r') as f:
+            texts += [f.read()]
+    report = asyncio.run(load_test(args.host[0], args.port[0], args.model[0], texts, n_requests=args.requests[0],
+                                   concurrency=args.concurrency[0], texts_per_request=args.batch[0]))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,40 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+
+from .complexity_model import ComplexityModel
+
+
+def merge(sources, path='.', model_name='complexity-model', gammas=(0.95,)):
+    """
+    :Description: merges the dumps of the models fitted with the same tokenizer, complexity function and
+     preprocessing flags on different parts of the reference collection, see :meth:`ComplexityModel.merge`
+    :param sources: paths to the dump directories
+    :type sources: list[str]
+    :param path: path to save the merged dump to, defaults to ``.``
+    :type path: str, optional
+    :param model_name: name of the merged dump directory, defaults to ``complexity-model``
+    :type model_name: str, optional
+    :param gammas: quantile indicators to precompute the quantiles for in addition to the ones of the first dump,
+     defaults to ``(0.95,)``
+    :type gammas: tuple, optional
+    """
+    model = ComplexityModel.load(sources[0], None, None, mmap=False)
+    for source in sources[1:]:
+        model.merge(ComplexityModel.load(source, None, None))
+    model.dump(path=path, model_name=model_name, gammas=gammas)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', nargs='*', help='paths to the dumps to merge')
+    parser.add_argument('-p', '--path', nargs='*', default=['.'], help='path to save the merged dump to')
+    parser.add_argument('-n', '--name', nargs='*', help='name of the merged model')
+    parser.add_argument('-g', '--gammas', nargs='*', type=float, default=[0.95],
+                        help='quantile indicators to precompute')
+    args = parser.parse_args()
+
+    merge(args.input, path=args.path[0], model_name=args.name[0], gammas=tuple(args.gammas))
@@ -0,0 +1,340 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import collections
+import functools
+import logging
+import os
+import queue
+import time
+import multiprocessing
+import traceback
+from pathlib import Path
+
+from . import corpus
+from . import profiling
+from .spec import resolve
+
+logger = logging.getLogger(__name__)
+
+WorkerFailure = collections.namedtuple('WorkerFailure', ['rank', 'error'])
+WorkerFailure.__doc__ = """
+:Description: sent to the results queue instead of the result by a fit worker which failed to start, ``error`` is
+ the formatted traceback
+"""
+
+
+def default_n_jobs():
+    """
+    :Description: returns the number of CPUs available to the current process
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_batches(reference_corpus_path, n_jobs, batches_per_job=16, max_batch_files=256):
+    """
+    :Description: splits the reference collection into small batches of files of roughly equal total size.
+     Batches are ordered from the largest to the smallest, so the workers pulling them from a shared queue start
+     with the longest documents and finish at nearly the same time
+    :param reference_corpus_path: path to the directory with the reference collection
+    :type reference_corpus_path: str
+    :param n_jobs: number of workers processing the batches
+    :type n_jobs: int
+    :param batches_per_job: approximate number of batches per worker, defaults to 16
+    :type batches_per_job: int, optional
+    :param max_batch_files: maximum number of files in a single batch, defaults to 256
+    :type max_batch_files: int, optional
+    """
+    files = [(os.path.getsize(filename), str(filename)) for filename in Path(reference_corpus_path).rglob('*.txt')]
+    files.sort(reverse=True)
+    total_size = sum(size for size, _ in files)
+    batch_size = max(total_size / max(int(n_jobs) * batches_per_job, 1), 1)
+
+    batches = []
+    current, current_size = [], 0
+    for size, filename in files:
+        current += [filename]
+        current_size += size
+        if current_size >= batch_size or len(current) >= max_batch_files:
+            batches += [current]
+            current, current_size = [], 0
+    if current:
+        batches += [current]
+    return batches
+
+
+def plan_text_batches(texts, max_batch_documents=256, max_batch_characters=1 << 22):
+    """
+    :Description: lazily groups the texts into batches of ``(doc_id, text)`` pairs bounded by the number of
+     documents and by their total length. The texts are consumed only as fast as the batches are taken
+    :param texts: texts or ``(doc_id, text)`` pairs, the texts are numbered in their order if not paired
+    :type texts: iterable
+    :param max_batch_documents: maximum number of documents in a single batch, defaults to 256
+    :type max_batch_documents: int, optional
+    :param max_batch_characters: maximum total length of the texts of a single batch, defaults to 4194304
+    :type max_batch_characters: int, optional
+    """
+    current, current_size = [], 0
+    for i, document in enumerate(texts):
+        if isinstance(document, str):
+            document = (i, document)
+        current += [tuple(document)]
+        current_size += len(document[1])
+        if current_size >= max_batch_characters or len(current) >= max_batch_documents:
+            yield current
+            current, current_size = [], 0
+    if current:
+        yield current
+
+
+def plan(reference_corpus, n_jobs):
+    """
+    :Description: returns the batches of the reference collection, see :func:`plan_batches` for the ``.txt`` files
+     of a directory and :func:`plan_text_batches` for an iterable of texts
+    :param reference_corpus: path to the directory with the reference collection, to a packed corpus file, or
+     iterable of texts or ``(doc_id, text)`` pairs. Packed files of the directory are split into shards by
+     :func:`corpus.plan_shards`, each shard making a batch
+    :type reference_corpus: str or iterable
+    :param n_jobs: number of workers processing the batches
+    :type n_jobs: int
+    """
+    if isinstance(reference_corpus, (str, os.PathLike)):
+        batches = [[shard] for shard in corpus.plan_shards(reference_corpus, n_jobs)]
+        if os.path.isdir(reference_corpus):
+            batches += plan_batches(reference_corpus, n_jobs)
+        return batches
+    return plan_text_batches(reference_corpus)
+
+
+def reduce_tree(value, rank, inboxes, results, merge):
+    """
+    :Description: combines partial results of the workers with a pairwise tree reduction. At each level worker
+     ``rank`` receives the value of worker ``rank + step`` and merges it into its own one, so the merges run in
+     parallel and the total result is sent to ``results`` by worker 0 only
+    :param value: partial result of the worker
+    :param rank: index of the worker
+    :type rank: int
+    :param inboxes: queues receiving partial results, one per worker
+    :type inboxes: list[multiprocessing.Queue]
+    :param results: queue receiving the total result
+    :type results: multiprocessing.Queue
+    :param merge: function combining two partial results
+    :type merge: callable
+    """
+    step = 1
+    while step < len(inboxes):
+        if rank % (2 * step):
+            inboxes[rank - step].put(value)
+            return
+        if rank + step < len(inboxes):
+            value = merge(value, inboxes[rank].get())
+        step *= 2
+    results.put(value)
+
+
+def document_failed(profiler, document_id, error):
+    profiler.count('errors')
+    logger.error('failed to read document %s: %r', document_id, error)
+
+
+def fit_worker(rank, tasks, inboxes, results, accumulator, progress=None):
+    """
+    :Description: processes the batches of documents pulled from the task queue with the accumulator and takes part
+     in the tree reduction of the results
+    :param rank: index of the worker
+    :type rank: int
+    :param tasks: queue of the batches, ``None`` marks the end. Items of a batch are read lazily by
+     :func:`corpus.read_task`, a document failing to be read or processed is logged, counted in ``errors`` and
+     skipped
+    :type tasks: multiprocessing.Queue
+    :param inboxes: queues receiving partial results, one per worker
+    :type inboxes: list[multiprocessing.Queue]
+    :param results: queue receiving the total result
+    :type results: multiprocessing.Queue
+    :param accumulator: accumulator with ``start``, ``add(text)``, ``flush``, ``result`` and ``merge`` methods and
+     the ``profiler`` attribute
+    :param progress: queue receiving the profiler snapshots after each batch, profiling is disabled if None,
+     defaults to None
+    :type progress: multiprocessing.Queue, optional
+    """
+    profiler = profiling.Profiler(rank) if progress is not None else profiling.NULL_PROFILER
+    accumulator.profiler = profiler
+    try:
+        accumulator.start()
+    except Exception:
+        results.put(WorkerFailure(rank, traceback.format_exc()))
+        return
+    try:
+        while True:
+            with profiler.stage('wait'):
+                batch = tasks.get()
+            if batch is None:
+                break
+            for task in batch:
+                documents = corpus.read_task(task, on_error=functools.partial(document_failed, profiler))
+                while True:
+                    try:
+                        with profiler.stage('read'):
+                            document_id, text = next(documents)
+                    except StopIteration:
+                        break
+                    except Exception:
+                        profiler.count('errors')
+                        logger.exception('failed to read task %s', task)
+                        break
+                    try:
+                        profiler.count('documents')
+                        if progress is not None:
+                            profiler.count('bytes', len(text.encode('utf-8')))
+                        accumulator.add(text)
+                    except Exception:
+                        profiler.count('errors')
+                        logger.exception('failed to process document %s', document_id)
+                        continue
+            accumulator.flush()
+            profiler.count('batches')
+            if progress is not None:
+                progress.put(profiler.snapshot())
+    except KeyboardInterrupt:
+        pass
+    result = accumulator.result()
+    with profiler.stage('reduce'):
+        reduce_tree(result, rank, inboxes, results, accumulator.merge)
+    if progress is not None:
+        progress.put(profiler.snapshot(done=True))
+
+
+def run(batches, accumulator, n_jobs, start_method=None, hook=None, max_queued_batches=None):
+    """
+    :Description: processes the batches with a pool of ``n_jobs`` persistent workers, each pulling the batches from
+     a shared queue into its own copy of the accumulator, and returns the merged result. The batches are taken
+     lazily and at most ``max_queued_batches`` of them wait in the queue, so a generator of batches is consumed
+     only as fast as the workers process it. ``RuntimeError`` is raised if a worker fails to start or exits
+     abnormally
+    :param batches: batches of documents
+    :type batches: iterable[list]
+    :param accumulator: accumulator, see :func:`fit_worker`
+    :param n_jobs: number of workers
+    :type n_jobs: int
+    :param start_method: ``multiprocessing`` start method, defaults to the platform default
+    :type start_method: str, optional
+    :param hook: receiver of the progress and of the final breakdown of the workers, profiling is disabled if
+     None, defaults to None
+    :type hook: profiling.ProfileHook, optional
+    :param max_queued_batches: maximum number of batches waiting in the queue, defaults to ``4 * n_jobs``
+    :type max_queued_batches: int, optional
+    """
+    context = multiprocessing.get_context(start_method)
+    processes = []
+    start = time.perf_counter()
+    snapshots = {}
+
+    def poll():
+        while progress is not None:
+            try:
+                snapshot = progress.get_nowait()
+            except queue.Empty:
+                return
+            snapshots[snapshot['worker']] = snapshot
+            hook.progress(snapshot)
+
+    def check(result=None):
+        if isinstance(result, WorkerFailure):
+            raise RuntimeError('fit worker {} failed to start:\n{}'.format(result.rank, result.error))
+        for process in processes:
+            if process.exitcode not in (None, 0):
+                raise RuntimeError('fit worker exited with code {}'.format(process.exitcode))
+        return result
+
+    def feed(task):
+        while True:
+            try:
+                tasks.put(task, timeout=0.05)
+                return
+            except queue.Full:
+                poll()
+                try:
+                    check(results.get_nowait())
+                except queue.Empty:
+                    check()
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError('all fit workers have exited')
+
+    try:
+        tasks = context.Queue(max_queued_batches or 4 * n_jobs)
+        inboxes = [context.Queue() for _ in range(n_jobs)]
+        results = context.Queue()
+        progress = context.Queue() if hook is not None else None
+
+        for rank in range(n_jobs):
+            process = context.Process(target=fit_worker, args=[rank, tasks, inboxes, results, accumulator, progress])
+            process.start()
+            processes += [process]
+        for batch in batches:
+            feed(batch)
+        for _ in range(n_jobs):
+            feed(None)
+
+        result = None
+        while result is None or (progress is not None and
+                                 sum(snapshot['done'] for snapshot in snapshots.values()) < n_jobs):
+            if progress is not None:
+                try:
+                    snapshot = progress.get(timeout=0.05)
+                    snapshots[snapshot['worker']] = snapshot
+                    hook.progress(snapshot)
+                    continue
+                except queue.Empty:
+                    pass
+            if result is None:
+                try:
+                    result = check(results.get(timeout=0.05))
+                    continue
+                except queue.Empty:
+                    pass
+            check()
+        if hook is not None:
+            hook.finish(profiling.report(list(snapshots.values()), time.perf_counter() - start))
+        return result
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+_predict_model = None
+
+
+def init_predict_worker(model):
+    """
+    :Description: initializes the prediction worker with the model used for all its batches and builds the
+     tokenizer and the complexity function of the model if they are given as specs
+    :param model: fitted complexity model
+    :type model: ComplexityModel
+    """
+    global _predict_model
+    _predict_model = model
+    resolve(model.tokenizer)
+    resolve(model.complexity_function)
+
+
+def predict_batch(task):
+    """
+    :Description: estimates the complexity scores of the batch of texts with the model of the worker
+    :param task: batch of texts, parameters of :meth:`ComplexityModel.predict` and the flag indicating whether to
+     profile the batch
+    :type task: tuple
+    :return: scores of the texts, complexities of the tokens and the profiler snapshot of the batch or None
+    :rtype: tuple
+    """
+    texts, parameters, profile = task
+    if not profile:
+        return _predict_model.predict(texts, **parameters) + (None,)
+    collector = profiling.ProfileCollector()
+    texts_complexities, token_complexities = _predict_model.predict(texts, hook=collector, **parameters)
+    snapshot = dict(collector.report['total'], worker=os.getpid(), done=False)
+    return texts_complexities, token_complexities, snapshot
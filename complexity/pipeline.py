@@ -0,0 +1,118 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+
+from . import parallel
+from .accumulators import DistributionAccumulator, PipelineAccumulator
+from .spec import resolve
+from .token_cache import tokenizer_key
+
+
+class ComplexityPipeline:
+    """
+    :Description: set of complexity models fitted together in a single parallel pass over the reference
+     collection. Models with the same tokenizer configuration, see :func:`tokenizer_key`, are grouped, so every
+     document is read once and tokenized once per distinct tokenizer
+    :param models: complexity models by their names, the names are used as the model names of the dumps
+    :type models: dict[str, ComplexityModel]
+    :param start_method: ``multiprocessing`` start method of the fit workers, defaults to the platform default
+    :type start_method: str, optional
+    """
+    def __init__(self, models, start_method=None):
+        self.models = dict(models)
+        self.start_method = start_method
+
+    def __getitem__(self, name):
+        return self.models[name]
+
+    def __iter__(self):
+        return iter(self.models)
+
+    def __len__(self):
+        return len(self.models)
+
+    def fit(self, reference_corpus, n_jobs=None, use_preproc=True,
+            use_stem=True, use_lemm=False, check_length=True, check_stopwords=True, hook=None):
+        """
+        :Description: fits all the models of the pipeline given the reference collection. The parameters are the
+         same as of :meth:`ComplexityModel.fit` and are applied to every model
+        :param reference_corpus: Path to the directory with reference collection, or iterable of texts or
+         ``(doc_id, text)`` pairs
+        :type reference_corpus: str or iterable
+        :param n_jobs: Number of parallel jobs processing the reference collection, defaults to the number of
+         available CPUs
+        :type n_jobs: int, optional
+        :param hook: receiver of the profiling results, see :meth:`ComplexityModel.fit`, defaults to None
+        :type hook: profiling.ProfileHook, optional
+        """
+        n_jobs = int(n_jobs) if n_jobs else parallel.default_n_jobs()
+        tokenize_parameters = dict(use_preproc=use_preproc, use_stem=use_stem, use_lemm=use_lemm,
+                                   check_length=check_length, check_stopwords=check_stopwords)
+        accumulator = PipelineAccumulator({
+            name: DistributionAccumulator(model.tokenizer, model.complexity_function, model.alphabet,
+                                          tokenize_parameters, token_cache=model.token_cache,
+                                          relative_accuracy=model.relative_accuracy)
+            for name, model in self.models.items()
+        })
+        distributions = parallel.run(parallel.plan(reference_corpus, n_jobs), accumulator, n_jobs,
+                                     start_method=self.start_method, hook=hook)
+        for name, model in self.models.items():
+            model.set_distributions(distributions[name])
+
+    def predict(self, texts, model_weights=None, parameters=None, gamma=0.95, weights='mean', p=1,
+                use_preproc=True, use_stem=True, use_lemm=False, check_length=True, check_stopwords=True,
+                exp_weights=False, weights_min_shift=False, normalize=False):
+        """
+        :Description: estimates the complexity scores of the texts with all the models of the pipeline. Each text
+         is tokenized once per distinct tokenizer and set of preprocessing flags, the tokens are scored by every
+         model sharing them
+        :param texts: texts to estimate complexity scores for
+        :type texts: list[str]
+        :param model_weights: weights of the models by their names. If given, only these models are used and the
+         weighted sum of their scores is returned for each text, defaults to None
+        :type model_weights: dict[str, float], optional
+        :param parameters: parameters of :meth:`ComplexityModel.predict` by the model names, overriding the
+         common ones given below for the particular models, defaults to None
+        :type parameters: dict[str, dict], optional
+        :return: array of shape ``(len(texts), len(models))`` with the scores of the models in the pipeline order,
+         or the array of the aggregated scores of the texts if ``model_weights`` is given
+        :rtype: np.ndarray
+        """
+        names = list(model_weights) if model_weights is not None else list(self.models)
+        common = dict(gamma=gamma, weights=weights, p=p, use_preproc=use_preproc, use_stem=use_stem,
+                      use_lemm=use_lemm, check_length=check_length, check_stopwords=check_stopwords,
+                      exp_weights=exp_weights, weights_min_shift=weights_min_shift, normalize=normalize)
+        tokenize_keys = ('use_preproc', 'use_stem', 'use_lemm', 'check_length', 'check_stopwords')
+
+        groups = {}
+        for column, name in enumerate(names):
+            model_parameters = dict(common, **(parameters or {}).get(name, {}))
+            tokenize_parameters = {key: model_parameters.pop(key) for key in tokenize_keys}
+            key = (tokenizer_key(resolve(self.models[name].tokenizer)), tuple(sorted(tokenize_parameters.items())))
+            if key not in groups:
+                groups[key] = (self.models[name].tokenize_function(tokenize_parameters), [])
+            groups[key][1].append((column, self.models[name], model_parameters))
+
+        scores = np.zeros((len(texts), len(names)))
+        for row, text in enumerate(texts):
+            for tokenize, group in groups.values():
+                tokens = tokenize(text)
+                for column, model, model_parameters in group:
+                    scores[row, column] = model.predict_tokens(tokens, **model_parameters)[0]
+        if model_weights is not None:
+            return scores @ np.array([model_weights[name] for name in names], dtype=np.float64)
+        return scores
+
+    def dump(self, path='.', gammas=(0.95,)):
+        """
+        :Description: dumps every model of the pipeline into the ``path`` directory under its name, see
+         :meth:`ComplexityModel.dump`
+        :param path: path to the directory, defaults to ``.``
+        :type path: str, optional
+        :param gammas: quantile indicators to precompute, defaults to ``(0.95,)``
+        :type gammas: tuple, optional
+        """
+        for name, model in self.models.items():
+            model.dump(path=path, model_name=name, gammas=gammas)
@@ -0,0 +1,175 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import collections
+import sys
+import time
+
+
+class Stage:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.seconds[self.name] += time.perf_counter() - self.start
+
+
+class NullStage:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class Profiler:
+    """
+    :Description: per-stage timers and counters of a single worker
+    :param worker: id of the worker, defaults to 0
+    :type worker: int, optional
+    """
+    enabled = True
+
+    def __init__(self, worker=0):
+        self.worker = worker
+        self.seconds = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+        self.stages = {}
+
+    def stage(self, name):
+        """
+        :Description: returns the context manager adding the time spent inside it to the stage
+        :param name: name of the stage
+        :type name: str
+        """
+        if name not in self.stages:
+            self.stages[name] = Stage(self, name)
+        return self.stages[name]
+
+    def count(self, name, value=1):
+        self.counts[name] += value
+
+    def snapshot(self, done=False):
+        """
+        :Description: returns the picklable copy of the timers and counters
+        :param done: flag indicating whether the worker has finished, defaults to False
+        :type done: bool, optional
+        """
+        return dict(worker=self.worker, done=done, seconds=dict(self.seconds), counts=dict(self.counts))
+
+
+class NullProfiler:
+    """
+    :Description: profiler doing nothing, used when the profiling is disabled
+    """
+    enabled = False
+    null_stage = NullStage()
+
+    def stage(self, name):
+        return self.null_stage
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def merge(snapshots):
+    """
+    :Description: sums up the timers and counters of the snapshots
+    :param snapshots: snapshots of :meth:`Profiler.snapshot`
+    :type snapshots: iterable[dict]
+    """
+    seconds = collections.defaultdict(float)
+    counts = collections.defaultdict(int)
+    for snapshot in snapshots:
+        for name, value in snapshot['seconds'].items():
+            seconds[name] += value
+        for name, value in snapshot['counts'].items():
+            counts[name] += value
+    return dict(seconds=dict(seconds), counts=dict(counts))
+
+
+def report(snapshots, wall_seconds):
+    """
+    :Description: builds the final breakdown passed to :meth:`ProfileHook.finish`
+    :param snapshots: last snapshots of the workers
+    :type snapshots: list[dict]
+    :param wall_seconds: wall time of the whole run
+    :type wall_seconds: float
+    """
+    snapshots = sorted(snapshots, key=lambda snapshot: snapshot['worker'])
+    return dict(wall_seconds=wall_seconds, workers=snapshots, total=merge(snapshots))
+
+
+class ProfileHook:
+    """
+    :Description: receives the profiling results of ``fit`` and ``predict``. Fit stages are ``wait`` (waiting for
+     a batch), ``read``, ``tokenize``, ``intern``, ``complexity``, ``accumulate``, ``flush`` (merging the batch into
+     the worker store) and ``reduce`` (transfer and merge of the worker results), predict stages are ``tokenize``
+     and ``score``. Counters are ``batches``, ``documents``, ``bytes`` (utf-8 encoded size of the texts), ``tokens``,
+     ``errors``, and ``cache_hits`` and ``cache_misses`` of the :class:`TokenCache`
+    """
+    def progress(self, snapshot):
+        """
+        :Description: called with the running totals of a worker after each of its batches
+        :param snapshot: dictionary with ``worker``, ``done``, ``seconds`` by stage and ``counts``
+        :type snapshot: dict
+        """
+        pass
+
+    def finish(self, report):
+        """
+        :Description: called once the run is over
+        :param report: dictionary with ``wall_seconds``, the last snapshots of the ``workers`` and their ``total``
+        :type report: dict
+        """
+        pass
+
+
+class ProfileCollector(ProfileHook):
+    """
+    :Description: keeps the final report in the ``report`` attribute
+    """
+    def __init__(self):
+        self.report = None
+
+    def finish(self, report):
+        self.report = report
+
+
+class ProgressPrinter(ProfileCollector):
+    """
+    :Description: prints the progress of the workers and the final breakdown by stage
+    :param stream: stream to print to, defaults to ``sys.stderr``
+    :type stream: file, optional
+    """
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream or sys.stderr
+        self.workers = {}
+
+    def progress(self, snapshot):
+        self.workers[snapshot['worker']] = snapshot
+        counts = merge(self.workers.values())['counts']
+        print('documents: {}, tokens: {}, bytes: {}'.format(counts.get('documents', 0),
+                                                            counts.get('tokens', 0),
+                                                            counts.get('bytes', 0)),
+              file=self.stream, flush=True)
+
+    def finish(self, report):
+        super().finish(report)
+        total = report['total']
+        print('wall time: {:.3f}s'.format(report['wall_seconds']), file=self.stream)
+        for name, seconds in sorted(total['seconds'].items(), key=lambda item: -item[1]):
+            print('{:<12} {:10.3f}s'.format(name, seconds), file=self.stream)
+        for name, value in sorted(total['counts'].items()):
+            print('{:<12} {:10d}'.format(name, value), file=self.stream)
+        self.stream.flush()
@@ -0,0 +1,80 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+
+
+def count_weights(scores, quantiles, weights='mean', min_value=np.nan, exp_weights=False,
+                  weights_min_shift=False):
+    """
+    :Description: counts the weights of all tokens of a single text at once
+    :param scores: complexity scores of the tokens
+    :type scores: np.ndarray
+    :param quantiles: quantiles of the token distributions, array of the same shape as ``scores`` or a scalar
+    :type quantiles: np.ndarray or float
+    :param weights: types of weights to use, defaults to ``mean``
+    :type weights: str, optional
+    :param min_value: minimum score over the distributions, used with ``weights_min_shift``
+    :type min_value: float, optional
+    :param exp_weights: flag indicating whether to apply exponential transformation to weights, defaults to False
+    :type exp_weights: bool, optional
+    :param weights_min_shift: flag indicating whether to subtract the minimum value from the weights,
+        defaults to False
+    :type weights_min_shift: bool, optional
+    """
+    nd = len(scores)
+    if weights == 'count':
+        weight = np.ones(nd, dtype=np.int64)
+    elif weights == 'mean':
+        weight = (scores + abs(min_value) + 1) / nd if weights_min_shift else scores / nd
+    elif weights == 'total':
+        weight = scores + abs(min_value) + 1 if weights_min_shift else scores
+    elif weights == 'excessive':
+        weight = scores - quantiles
+    elif weights == 'excessive_mean':
+        weight = (scores - quantiles) / nd
+    else:
+        weight = np.zeros(nd, dtype=np.int64)
+    if exp_weights:
+        weight = np.tanh(weight)
+    return weight
+
+
+def score_text(scores, quantiles, weights='mean', p=1, min_value=np.nan, exp_weights=False,
+               weights_min_shift=False, compared_scores=None):
+    """
+    :Description: estimates the complexity of a single text given the scores of its tokens and the quantiles
+     of their distributions. Sums are accumulated sequentially, so the results are identical to token-by-token
+     accumulation
+    :param scores: complexity scores of the tokens
+    :type scores: np.ndarray
+    :param quantiles: quantiles of the token distributions, array of the same shape as ``scores`` or a scalar
+    :type quantiles: np.ndarray or float
+    :param weights: types of weights to use, defaults to ``mean``
+    :type weights: str, optional
+    :param p: power of the weights, defaults to 1
+    :type p: int, optional
+    :param min_value: minimum score over the distributions, used with ``weights_min_shift``
+    :type min_value: float, optional
+    :param exp_weights: flag indicating whether to apply exponential transformation to weights, defaults to False
+    :type exp_weights: bool, optional
+    :param weights_min_shift: flag indicating whether to subtract the minimum value from the weights,
+        defaults to False
+    :type weights_min_shift: bool, optional
+    :param compared_scores: scores compared with the quantiles to flag the complex tokens, e.g. quantized the same
+     way as the distributions, defaults to ``scores``
+    :type compared_scores: np.ndarray, optional
+    :return: text complexity, total weight, weights of the tokens and flags of complex tokens. The sums are numpy
+     scalars, so normalizing by a zero total weight gives ``inf`` or ``nan`` as the token-by-token sums did
+    """
+    weight = count_weights(scores, quantiles, weights, min_value, exp_weights, weights_min_shift)
+    if weight.dtype.kind in 'iu' and not (isinstance(p, (int, np.integer)) and p >= 0):
+        weight = weight.astype(np.float64)
+    is_complex = (scores if compared_scores is None else compared_scores) >= quantiles
+    powered = weight ** p
+    complexity, total_score = 0, 0
+    if len(scores) > 0:
+        complexity = np.cumsum(powered * is_complex)[-1]
+        total_score = np.cumsum(powered)[-1]
+    return complexity, total_score, weight, is_complex
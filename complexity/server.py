@@ -0,0 +1,317 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import asyncio
+import argparse
+import collections
+import concurrent.futures
+import json
+import time
+
+import numpy as np
+
+from . import utils
+from .complexity_model import ComplexityModel
+
+
+PREDICT_PARAMETERS = {'gamma', 'weights', 'p', 'use_preproc', 'use_stem', 'use_lemm', 'check_length',
+                      'check_stopwords', 'exp_weights', 'weights_min_shift', 'normalize',
+                      'return_token_complexities'}
+
+STATUS_LINES = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+_worker_models = {}
+
+
+def load_models(config):
+    """
+    :Description: loads the dumped models described by the config
+    :param config: mapping of model names to descriptions with the ``path`` to the dump and the ``tokenizer`` and
+     ``complexity_function`` given as ``{"class": "tokenizers.WordTokenizer", "kwargs": {...}}``
+    :type config: dict
+    """
+    models = {}
+    for name, description in config.items():
+        tokenizer = description['tokenizer']
+        complexity_function = description['complexity_function']
+        models[name] = ComplexityModel.load(description['path'],
+                                            utils.import_object(tokenizer['class'])(**tokenizer.get('kwargs', {})),
+                                            utils.import_object(complexity_function['class'])(
+                                                **complexity_function.get('kwargs', {})))
+    return models
+
+
+def init_worker(models):
+    global _worker_models
+    _worker_models = models
+
+
+def predict_batch(model_name, requests, parameters):
+    """
+    :Description: scores the requests of the micro-batch with the model of the worker. A failing request gets its
+     exception as the result, so it does not fail the other requests of the batch
+    """
+    model = _worker_models[model_name]
+    results = []
+    for texts in requests:
+        try:
+            results += [model.predict(texts, **parameters)]
+        except Exception as e:
+            results += [e]
+    return results
+
+
+class ServerStats:
+    """
+    :Description: throughput and latency statistics of the scoring server
+    :param window: number of the latest requests to count the latency percentiles over, defaults to 10000
+    :type window: int, optional
+    """
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.errors = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def add_request(self, n_texts, latency):
+        self.requests += 1
+        self.texts += n_texts
+        self.latencies.append(latency)
+
+    def add_batch(self, n_texts):
+        self.batches += 1
+        self.batched_texts += n_texts
+
+    def report(self):
+        uptime = time.monotonic() - self.started
+        report = {'uptime': uptime, 'requests': self.requests, 'texts': self.texts, 'errors': self.errors,
+                  'batches': self.batches, 'requests_per_second': self.requests / uptime,
+                  'texts_per_second': self.texts / uptime,
+                  'mean_batch_size': self.batched_texts / self.batches if self.batches else 0}
+        if self.latencies:
+            latencies = np.asarray(self.latencies)
+            for percentile in (50, 95, 99):
+                report['latency_p{}'.format(percentile)] = float(np.percentile(latencies, percentile))
+            report['latency_mean'] = float(latencies.mean())
+        return report
+
+
+class Batcher:
+    """
+    :Description: coalesces concurrent requests to the same model with the same parameters into micro-batches.
+     The batcher removes itself from the server once no request comes for ``server.idle_timeout`` seconds
+    :param server: scoring server running the batches
+    :type server: ScoringServer
+    :param model_name: name of the model
+    :type model_name: str
+    :param parameters: parameters of :meth:`ComplexityModel.predict`
+    :type parameters: dict
+    """
+    def __init__(self, server, model_name, parameters):
+        self.server = server
+        self.model_name = model_name
+        self.parameters = parameters
+        self.key = (model_name, tuple(sorted(parameters.items())))
+        self.queue = asyncio.Queue()
+        self.task = asyncio.ensure_future(self.__run())
+
+    async def submit(self, texts):
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def __run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                requests = [await asyncio.wait_for(self.queue.get(), self.server.idle_timeout)]
+            except asyncio.TimeoutError:
+                if self.queue.empty():
+                    del self.server.batchers[self.key]
+                    return
+                continue
+            size = len(requests[0][0])
+            deadline = loop.time() + self.server.max_latency
+            while size < self.server.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    requests += [await asyncio.wait_for(self.queue.get(), timeout)]
+                except asyncio.TimeoutError:
+                    break
+                size += len(requests[-1][0])
+            asyncio.ensure_future(self.__score(requests))
+
+    async def __score(self, requests):
+        self.server.stats.add_batch(sum(len(texts) for texts, _ in requests))
+        try:
+            results = await asyncio.get_event_loop().run_in_executor(
+                self.server.executor, predict_batch, self.model_name,
+                [texts for texts, _ in requests], self.parameters)
+        except Exception as e:
+            results = [e] * len(requests)
+        for (_, future), result in zip(requests, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class ScoringServer:
+    """
+    :Description: asyncio HTTP server scoring texts with the loaded complexity models. Concurrent requests are
+     coalesced into micro-batches, tokenization and scoring run in a pool of worker processes holding the models
+    :param models: mapping of model names to the fitted models
+    :type models: dict
+    :param max_batch_size: maximum number of texts in a micro-batch, defaults to 64
+    :type max_batch_size: int, optional
+    :param max_latency: maximum time in seconds a request waits for the micro-batch to fill, defaults to 0.01
+    :type max_latency: float, optional
+    :param n_jobs: number of worker processes, defaults to the number of available CPUs
+    :type n_jobs: int, optional
+    :param idle_timeout: time in seconds after which the batcher of a model and parameters no request came for is
+     dropped, so that the batchers of rarely used parameters do not pile up, defaults to 60
+    :type idle_timeout: float, optional
+    """
+    def __init__(self, models, max_batch_size=64, max_latency=0.01, n_jobs=None, idle_timeout=60):
+        self.models = models
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.idle_timeout = idle_timeout
+        self.executor = concurrent.futures.ProcessPoolExecutor(n_jobs, initializer=init_worker, initargs=(models,))
+        # forked workers have to be started before any client socket is open, otherwise they inherit
+        # the socket and keep the connection alive after the server closes it
+        self.executor.submit(int).result()
+        self.batchers = {}
+        self.stats = ServerStats()
+
+    async def predict(self, model_name, texts, parameters):
+        """
+        :Description: scores the texts with the model within the next micro-batch
+        :param model_name: name of the model
+        :type model_name: str
+        :param texts: texts to estimate complexity scores for
+        :type texts: list[str]
+        :param parameters: parameters of :meth:`ComplexityModel.predict`
+        :type parameters: dict
+        :return: scores of the texts and token complexities as returned by :meth:`ComplexityModel.predict`
+        """
+        if model_name not in self.models:
+            raise KeyError('unknown model {}'.format(model_name))
+        unknown = set(parameters) - PREDICT_PARAMETERS
+        if unknown:
+            raise ValueError('unknown parameters {}'.format(', '.join(sorted(unknown))))
+        key = (model_name, tuple(sorted(parameters.items())))
+        if key not in self.batchers:
+            self.batchers[key] = Batcher(self, model_name, parameters)
+        started = time.monotonic()
+        result = await self.batchers[key].submit(texts)
+        self.stats.add_request(len(texts), time.monotonic() - started)
+        return result
+
+    async def __handle_request(self, method, target, body):
+        if method == 'GET' and target == '/stats':
+            return 200, self.stats.report()
+        if method == 'GET' and target == '/models':
+            return 200, {'models': sorted(self.models)}
+        if method != 'POST' or target != '/predict':
+            return 404, {'error': 'not found'}
+        try:
+            request = json.loads(body.decode('utf-8'))
+            texts = request['texts']
+            if not isinstance(texts, list):
+                raise ValueError('texts must be a list')
+            scores, token_complexities = await self.predict(request['model'], texts,
+                                                            request.get('parameters', {}))
+        except (ValueError, KeyError, TypeError) as e:
+            self.stats.errors += 1
+            return 400, {'error': str(e)}
+        except Exception as e:
+            self.stats.errors += 1
+            return 500, {'error': repr(e)}
+        response = {'scores': scores}
+        if token_complexities:
+            response['token_complexities'] = token_complexities
+        return 200, response
+
+    async def __handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, response = await self.__handle_request(method, target, body)
+                payload = json.dumps(response, default=lambda value: value.item()).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                             'Connection: {}\r\n\r\n'.format(status, STATUS_LINES[status], len(payload),
+                                                              'keep-alive' if keep_alive else 'close')
+                             .encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        """
+        :Description: runs the HTTP server. ``POST /predict`` with ``{"model": ..., "texts": [...],
+         "parameters": {...}}`` returns ``{"scores": [...]}`` along with ``token_complexities`` if requested,
+         ``GET /stats`` returns the server statistics
+        :param host: host to listen on, defaults to ``127.0.0.1``
+        :type host: str, optional
+        :param port: port to listen on, defaults to 8000
+        :type port: int, optional
+        """
+        server = await asyncio.start_server(self.__handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for batcher in list(self.batchers.values()):
+            batcher.task.cancel()
+        self.executor.shutdown()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-c', '--config', nargs='*', help='path to the json config describing the models')
+    parser.add_argument('-H', '--host', nargs='*', default=['127.0.0.1'], help='host to listen on')
+    parser.add_argument('-P', '--port', nargs='*', type=int, default=[8000], help='port to listen on')
+    parser.add_argument('-b', '--batch', nargs='*', type=int, default=[64], help='maximum micro-batch size')
+    parser.add_argument('-l', '--latency', nargs='*', type=float, default=[0.01],
+                        help='maximum micro-batch latency in seconds')
+    parser.add_argument('-j', '--jobs', nargs='*', type=int, default=[None], help='number of worker processes')
+    parser.add_argument('-i', '--idle-timeout', nargs='*', type=float, default=[60],
+                        help='time in seconds after which an unused batcher is dropped')
+    args = parser.parse_args()
+
+    with open(args.config[0], 'r') as f:
+        config = json.load(f)
+    scoring_server = ScoringServer(load_models(config), max_batch_size=args.batch[0], max_latency=args.latency[0],
+                                   n_jobs=args.jobs[0], idle_timeout=args.idle_timeout[0])
+    try:
+        asyncio.run(scoring_server.serve(args.host[0], args.port[0]))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scoring_server.close()
@@ -0,0 +1,59 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+
+from .distributions import DistributionStore
+
+
+class LogQuantizer:
+    """
+    :Description: maps the scores to the logarithmically spaced buckets of the DDSketch quantile sketch. The
+     bucket ``i`` holds the absolute values in ``(g^(i-1), g^i]`` with ``g = (1 + a) / (1 - a)`` and is represented
+     by ``2 g^i / (g + 1)``, which differs from any value of the bucket by at most the relative accuracy ``a``.
+     Negative scores are mapped symmetrically, zero is kept as is.
+
+     Distributions of the quantized scores are exact histograms over the buckets, so they are merged without any
+     loss, and the number of distinct scores of a token is bounded by about ``2 log(max / min) / log(g) + 3``
+     for the range of absolute values ``[min, max]`` instead of the number of distinct scores.
+
+     The quantization is monotonic, so the gamma-quantile counted over the quantized distribution is the
+     representative of the bucket of the exact quantile, or of the next non-empty bucket above it when the smaller
+     scores falling into the same bucket push the tail share of the bucket above ``1 - gamma``. For the tokens with
+     dense distributions, the ones the quantization is meant for, the neighbouring buckets are non-empty and the
+     quantile differs from the exact one by at most about ``3a`` relatively; for sparse distributions the error is
+     bounded by the gap to the next observed bucket
+    :param relative_accuracy: relative accuracy ``a`` of the quantiles, ``0 < a < 1``, defaults to 0.01
+    :type relative_accuracy: float, optional
+    """
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be in (0, 1), got {}'.format(relative_accuracy))
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+
+    def quantize(self, scores):
+        """
+        :Description: returns the representatives of the buckets of the scores
+        :param scores: scores to quantize
+        :type scores: np.ndarray
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        magnitudes = np.abs(scores)
+        nonzero = magnitudes > 0
+        buckets = np.ceil(np.log(magnitudes[nonzero]) / self.log_gamma)
+        quantized = np.zeros_like(scores)
+        quantized[nonzero] = np.sign(scores[nonzero]) * 2 * np.exp(buckets * self.log_gamma) / (self.gamma + 1)
+        return quantized
+
+    def compact(self, store):
+        """
+        :Description: returns the store with the scores of the exact distributions quantized
+        :param store: store to compact
+        :type store: DistributionStore
+        """
+        quantized = DistributionStore(store.vocabulary, np.asarray(store.offsets), self.quantize(store.scores),
+                                      np.asarray(store.counts))
+        return DistributionStore().merge(quantized)
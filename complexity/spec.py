@@ -0,0 +1,58 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from . import utils
+
+
+class Spec:
+    """
+    :Description: picklable recipe of an object, e.g. a tokenizer or a complexity function: its class, or the dotted
+     path to it, and the constructor arguments. The object is built on the first :meth:`instance` call in each
+     process and is never pickled, so worker processes started with ``spawn`` or ``forkserver`` build their own
+     copies of heavy models once instead of receiving them from the parent
+    :param factory: class or any callable building the object, or its dotted path such as
+     ``tokenizers.WordTokenizer``
+    :type factory: callable or str
+    """
+    def __init__(self, factory, *args, **kwargs):
+        self.factory = factory
+        self.args = args
+        self.kwargs = kwargs
+        self.__instance = None
+
+    def build(self):
+        """
+        :Description: builds a new object from the recipe
+        """
+        factory = utils.import_object(self.factory) if isinstance(self.factory, str) else self.factory
+        return factory(*self.args, **self.kwargs)
+
+    def instance(self):
+        """
+        :Description: returns the object built from the recipe, building it on the first call in the process
+        """
+        if self.__instance is None:
+            self.__instance = self.build()
+        return self.__instance
+
+    def __getstate__(self):
+        return {'factory': self.factory, 'args': self.args, 'kwargs': self.kwargs}
+
+    def __setstate__(self, state):
+        self.__init__(state['factory'], *state['args'], **state['kwargs'])
+
+    def __repr__(self):
+        arguments = [repr(arg) for arg in self.args] + ['{}={!r}'.format(*item) for item in self.kwargs.items()]
+        return 'Spec({!r}, {})'.format(self.factory, ', '.join(arguments))
+
+
+def resolve(obj):
+    """
+    :Description: returns the object built from the spec, or the object itself if it is not a spec
+    :param obj: object or its spec
+    :type obj: object or Spec
+    """
+    if isinstance(obj, Spec):
+        return obj.instance()
+    return obj
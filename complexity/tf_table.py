@@ -0,0 +1,180 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+import os
+import pickle
+
+import numpy as np
+
+from storage.arrays import save_array
+from storage.hash_index import HashIndex, hash_tokens
+from storage.string_pool import StringPool
+
+from . import parallel
+from .accumulators import TermFrequencyAccumulator
+from .distributions import DistributionStore, REDUCED_TOKEN
+from .sketch import LogQuantizer
+
+
+class TermFrequencyTable:
+    """
+    :Description: immutable mapping of tokens to their term frequencies, indexed by the sorted 64-bit hashes of the
+     tokens. The tokens themselves are kept in a :class:`StringPool` in the order of their hashes, so every hit of
+     the hash index is checked against the token. Saved tables are memory-mapped on load, so the workers opening the
+     same table share its pages instead of copying a dictionary each
+    :param hashes: sorted hashes of the tokens
+    :type hashes: np.ndarray
+    :param counts: term frequencies in the order of the hashes
+    :type counts: np.ndarray
+    :param tokens: tokens in the order of the hashes
+    :type tokens: StringPool
+    """
+    def __init__(self, hashes, counts, tokens):
+        self.hashes = hashes
+        self.counts = counts
+        self.tokens = tokens
+        self.index = HashIndex(hashes, tokens)
+
+    @staticmethod
+    def build(frequencies):
+        """
+        :Description: builds the table from the dictionary of term frequencies
+        :param frequencies: term frequencies by the tokens
+        :type frequencies: dict[str, int]
+        """
+        tokens = list(frequencies)
+        hashes = hash_tokens(tokens)
+        order = np.argsort(hashes, kind='stable')
+        hashes = hashes[order]
+        if len(hashes) > 1 and np.any(hashes[1:] == hashes[:-1]):
+            raise ValueError('hash collision between the tokens of the table')
+        counts = np.asarray([frequencies[token] for token in tokens])
+        return TermFrequencyTable(hashes, counts[order], StringPool.build([tokens[i] for i in order]))
+
+    @staticmethod
+    def fit(reference_corpus, tokenizer, n_jobs=None, start_method=None, token_cache=None, use_preproc=True,
+            use_stem=True, use_lemm=False, check_length=True, check_stopwords=True, hook=None):
+        """
+        :Description: counts the term frequencies of the tokens over the reference collection with the parallel
+         workers of :meth:`ComplexityModel.fit`. The tokenizer and the preprocessing flags should be the same as of
+         the model the table is built for
+        :param reference_corpus: path to the directory with the reference collection, or iterable of texts or
+         ``(doc_id, text)`` pairs
+        :type reference_corpus: str or iterable
+        :param tokenizer: Tokenizer instance or its spec
+        :type tokenizer: Tokenizer or Spec
+        :param n_jobs: number of parallel jobs, defaults to the number of available CPUs
+        :type n_jobs: int, optional
+        :param start_method: ``multiprocessing`` start method of the workers, defaults to the platform default
+        :type start_method: str, optional
+        :param token_cache: path to the :class:`TokenCache` directory, defaults to None
+        :type token_cache: str, optional
+        :param hook: receiver of the profiling results, see :meth:`ComplexityModel.fit`, defaults to None
+        :type hook: profiling.ProfileHook, optional
+        """
+        n_jobs = int(n_jobs) if n_jobs else parallel.default_n_jobs()
+        accumulator = TermFrequencyAccumulator(tokenizer, dict(use_preproc=use_preproc, use_stem=use_stem,
+                                                               use_lemm=use_lemm, check_length=check_length,
+                                                               check_stopwords=check_stopwords),
+                                               token_cache=token_cache)
+        frequencies = parallel.run(parallel.plan(reference_corpus, n_jobs), accumulator, n_jobs,
+                                   start_method=start_method, hook=hook)
+        return TermFrequencyTable.build(frequencies)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __getitem__(self, token):
+        counts, found = self.lookup([token])
+        if not found[0]:
+            raise KeyError(token)
+        return counts[0].item()
+
+    def __contains__(self, token):
+        return bool(self.lookup([token])[1][0])
+
+    def items(self):
+        return zip(self.tokens, self.counts.tolist())
+
+    def lookup(self, tokens):
+        """
+        :Description: looks up the term frequencies of all the tokens at once with :meth:`HashIndex.find`
+        :param tokens: tokens to look up
+        :type tokens: list[str]
+        :return: term frequencies of the tokens (zero for the absent ones) and the mask of the tokens present in the
+         table
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        positions = self.index.find(tokens)
+        found = positions >= 0
+        counts = np.zeros(len(tokens), dtype=self.counts.dtype)
+        counts[found] = np.asarray(self.counts)[positions[found]]
+        return counts, found
+
+    def counter_distributions(self, relative_accuracy=None):
+        """
+        :Description: returns the ``reduced`` distributions of the lexical-counter model over the collection the
+         table was counted on: each of the ``tf`` occurrences of a token scores ``-tf``. They are the same as
+         :meth:`ComplexityModel.fit` would count with this table, without the second pass over the collection
+        :param relative_accuracy: relative accuracy of the :class:`LogQuantizer` the scores are quantized with,
+         see :class:`ComplexityModel`, defaults to None
+        :type relative_accuracy: float, optional
+        """
+        counts = np.asarray(self.counts)
+        scores = -counts
+        if relative_accuracy is not None:
+            scores = LogQuantizer(relative_accuracy).quantize(scores)
+        store = DistributionStore([REDUCED_TOKEN], np.array([0, len(counts)], dtype=np.int64), scores, counts)
+        return DistributionStore().merge(store)
+
+    def save(self, path):
+        """
+        :Description: saves the table as flat ``.npy`` arrays into the directory
+        :param path: path to the directory
+        :type path: str
+        """
+        os.makedirs(path, exist_ok=True)
+        save_array(os.path.join(path, 'hashes.npy'), self.hashes)
+        save_array(os.path.join(path, 'counts.npy'), self.counts)
+        self.tokens.save(path, 'tokens')
+
+    @staticmethod
+    def load(path, mmap=True):
+        """
+        :Description: loads the table saved by :meth:`save`
+        :param path: path to the directory
+        :type path: str
+        :param mmap: flag indicating whether to memory-map the table instead of reading it, defaults to True
+        :type mmap: bool, optional
+        """
+        mmap_mode = 'r' if mmap else None
+        return TermFrequencyTable(np.load(os.path.join(path, 'hashes.npy'), mmap_mode=mmap_mode),
+                                  np.load(os.path.join(path, 'counts.npy'), mmap_mode=mmap_mode),
+                                  StringPool.load(path, 'tokens', mmap=mmap))
+
+    @staticmethod
+    def open(path, mmap=True):
+        """
+        :Description: opens the table saved by :meth:`save` or builds it from the pickled dictionary of the term
+         frequencies
+        :param path: path to the table directory or to the pickle file
+        :type path: str
+        :param mmap: flag indicating whether to memory-map the saved table, defaults to True
+        :type mmap: bool, optional
+        """
+        if os.path.isdir(path):
+            return TermFrequencyTable.load(path, mmap=mmap)
+        with open(path, 'rb') as f:
+            return TermFrequencyTable.build(pickle.load(f))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', nargs='*', help='path to the tf pickle dump')
+    parser.add_argument('-o', '--output', nargs='*', help='path to the directory to save the table to')
+    args = parser.parse_args()
+
+    TermFrequencyTable.open(args.input[0]).save(args.output[0])
@@ -0,0 +1,156 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from . import utils
+from .profiling import NULL_PROFILER
+
+
+PLAIN_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def configuration(value):
+    """
+    :Description: returns the canonical representation of a plain value: a string, a number, None or a collection
+     of plain values, with the sets and the dictionaries sorted. None is returned for other values
+    """
+    if isinstance(value, PLAIN_TYPES):
+        return repr(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [configuration(item) for item in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return '{}({})'.format(type(value).__name__, ', '.join(items))
+    if isinstance(value, dict):
+        items = [(configuration(key), configuration(item)) for key, item in value.items()]
+        if any(key is None or item is None for key, item in items):
+            return None
+        return 'dict({})'.format(', '.join('{}: {}'.format(key, item) for key, item in sorted(items)))
+    return None
+
+
+def tokenizer_key(tokenizer):
+    """
+    :Description: returns the key of the tokenizer configuration: its class, its ``cache_key`` attribute and the one
+     of its ``preprocessor``, if any. Tokenizers without ``cache_key`` are keyed by their plain attributes instead
+     (strings, numbers and their collections, e.g. the ``mode`` of :class:`EnSentenceTokenizer`), so a tokenizer
+     whose output depends on anything else, e.g. a loaded model, should set ``cache_key`` describing it.
+     Tokenizers with equal keys are expected to return the same tokens
+    :param tokenizer: Tokenizer instance
+    :type tokenizer: Tokenizer
+    """
+    preprocessor = getattr(tokenizer, 'preprocessor', None)
+    if hasattr(tokenizer, 'cache_key'):
+        key = tokenizer.cache_key
+    else:
+        attributes = ((name, configuration(value)) for name, value in vars(tokenizer).items()
+                      if name != 'preprocessor') if hasattr(tokenizer, '__dict__') else ()
+        key = tuple(sorted((name, value) for name, value in attributes if value is not None))
+    return (type(tokenizer).__module__, type(tokenizer).__qualname__, key, getattr(preprocessor, 'cache_key', None))
+
+
+class TokenCache:
+    """
+    :Description: content-addressed on-disk cache of tokenizer output. Entries are keyed by the hash of the
+     document text, the :func:`tokenizer_key` of the tokenizer and the preprocessing flags. Hashable tokens are
+     stored interned: the list of distinct tokens and an array of their ids
+    :param path: path to the cache directory
+    :type path: str
+    :param tokenizer: Tokenizer instance
+    :type tokenizer: Tokenizer
+    :param tokenize_parameters: preprocessing flags passed to ``tokenize``
+    :type tokenize_parameters: dict
+    :param profiler: profiler counting the ``cache_hits`` and ``cache_misses``, defaults to None
+    :type profiler: profiling.Profiler, optional
+    """
+    def __init__(self, path, tokenizer, tokenize_parameters, profiler=None):
+        self.path = path
+        self.tokenizer = tokenizer
+        self.tokenize_parameters = tokenize_parameters
+        self.profiler = profiler or NULL_PROFILER
+        self.hits = 0
+        self.misses = 0
+        identity = tokenizer_key(tokenizer) + (sorted(tokenize_parameters.items()),)
+        self.prefix = hashlib.blake2b(repr(identity).encode('utf-8'), digest_size=16).digest()
+        utils.create_folder(path)
+
+    def key(self, text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=20, key=self.prefix).hexdigest()
+
+    def __entry_path(self, key):
+        return os.path.join(self.path, key[:2], key + '.bin')
+
+    @staticmethod
+    def encode(tokens):
+        """
+        :Description: encodes the tokens as the list of distinct tokens and the array of their ids, or keeps them
+         as is if they are not hashable
+        """
+        try:
+            index = {}
+            ids = np.fromiter((index.setdefault(token, len(index)) for token in tokens), dtype=np.int32,
+                              count=len(tokens))
+        except TypeError:
+            return None, tokens
+        return list(index), ids
+
+    @staticmethod
+    def decode(entry):
+        vocabulary, ids = entry
+        if vocabulary is None:
+            return ids
+        return [vocabulary[i] for i in ids.tolist()]
+
+    def get(self, text):
+        """
+        :Description: returns the cached tokens of the text or None
+        :param text: document text
+        :type text: str
+        """
+        try:
+            with open(self.__entry_path(self.key(text)), 'rb') as f:
+                return self.decode(pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, text, tokens):
+        """
+        :Description: stores the tokens of the text. The entry is written to a temporary file and renamed, so
+         concurrent workers never read partially written entries
+        :param text: document text
+        :type text: str
+        :param tokens: output of the tokenizer
+        :type tokens: list
+        """
+        entry_path = self.__entry_path(self.key(text))
+        utils.create_folder(os.path.dirname(entry_path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        with os.fdopen(descriptor, 'wb') as f:
+            pickle.dump(self.encode(tokens), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+
+    def tokenize(self, text):
+        """
+        :Description: returns the tokens of the text from the cache, tokenizing and caching them on a miss
+        :param text: document text
+        :type text: str
+        """
+        tokens = self.get(text)
+        if tokens is not None:
+            self.hits += 1
+            self.profiler.count('cache_hits')
+            return tokens
+        self.misses += 1
+        self.profiler.count('cache_misses')
+        tokens = self.tokenizer.tokenize(text, **self.tokenize_parameters)
+        self.put(text, tokens)
+        return tokens
@@ -3,7 +3,21 @@
 #
 
 import os
+import itertools
+import importlib
 
 def create_folder(directory):
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    os.makedirs(directory, exist_ok=True)
+
+
+def batches(iterable, batch_size):
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, batch_size))
+
+
+def import_object(path):
+    module_name, _, name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,132 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+
+from storage.hash_index import HashIndex
+from storage.string_pool import StringPool
+
+
+class Vocabulary:
+    """
+    :Description: interns tokens to consecutive integer ids in the order of their first occurrence, so that the
+     tokens are hashed once and complexity functions, distributions and quantiles work with int arrays
+    :param tokens: initial tokens in the order of their ids
+    :type tokens: iterable, optional
+    """
+    def __init__(self, tokens=()):
+        self.tokens = list(tokens)
+        self.index = {token: i for i, token in enumerate(self.tokens)}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, i):
+        return self.tokens[i]
+
+    def __contains__(self, token):
+        return token in self.index
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def intern(self, tokens):
+        """
+        :Description: maps the tokens to their ids, adding the new tokens to the vocabulary
+        :param tokens: tokens to intern
+        :type tokens: list
+        """
+        index = self.index
+        ids = np.empty(len(tokens), dtype=np.int64)
+        for position, token in enumerate(tokens):
+            i = index.get(token)
+            if i is None:
+                i = index[token] = len(self.tokens)
+                self.tokens.append(token)
+            ids[position] = i
+        return ids
+
+    def find(self, tokens):
+        """
+        :Description: returns the ids of the tokens, ``-1`` for the tokens absent in the vocabulary
+        :param tokens: tokens to look up
+        :type tokens: list
+        """
+        index = self.index
+        return np.fromiter((index.get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+
+    def ids(self, tokens, intern_unknown=False):
+        """
+        :Description: maps the tokens to their ids without changing the vocabulary
+        :param tokens: tokens to map
+        :type tokens: list
+        :param intern_unknown: flag indicating whether to give the tokens absent in the vocabulary temporary ids
+         starting from ``len(vocabulary)``, equal for equal tokens, instead of ``-1``, defaults to False
+        :type intern_unknown: bool, optional
+        """
+        ids = self.find(tokens)
+        if intern_unknown:
+            unknown = {}
+            for position in np.flatnonzero(ids < 0).tolist():
+                ids[position] = unknown.setdefault(tokens[position], len(self.tokens) + len(unknown))
+        return ids
+
+
+class PooledVocabulary(Vocabulary):
+    """
+    :Description: read-only vocabulary of string tokens, kept in a :class:`StringPool` in the order of their ids and
+     looked up through a :class:`HashIndex`. Saved vocabularies are memory-mapped on load, so the processes loading
+     the same model share their pages instead of unpickling a list and a dictionary each
+    :param tokens: tokens in the order of their ids
+    :type tokens: StringPool
+    :param index: hash index of the tokens
+    :type index: HashIndex
+    """
+    def __init__(self, tokens, index):
+        self.tokens = tokens
+        self.index = index
+
+    @staticmethod
+    def build(tokens):
+        """
+        :Description: builds the vocabulary from the string tokens in the order of their ids
+        :param tokens: tokens to store
+        :type tokens: list[str]
+        """
+        pool = StringPool.build(tokens)
+        return PooledVocabulary(pool, HashIndex.build(pool))
+
+    def __contains__(self, token):
+        return self.find([token])[0] >= 0
+
+    def intern(self, tokens):
+        raise TypeError('pooled vocabulary is read-only')
+
+    def find(self, tokens):
+        return self.index.find(tokens)
+
+    def save(self, path, name):
+        """
+        :Description: saves the vocabulary as a pool and a hash index named ``name`` into the directory
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the vocabulary
+        :type name: str
+        """
+        self.tokens.save(path, name)
+        self.index.save(path, name)
+
+    @staticmethod
+    def load(path, name, mmap=True):
+        """
+        :Description: loads the vocabulary saved by :meth:`save`
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the vocabulary
+        :type name: str
+        :param mmap: flag indicating whether to memory-map the vocabulary instead of reading it, defaults to True
+        :type mmap: bool, optional
+        """
+        tokens = StringPool.load(path, name, mmap=mmap)
+        return PooledVocabulary(tokens, HashIndex.load(path, name, tokens, mmap=mmap))
@@ -2,15 +2,48 @@
 # Created by maks5507 (me@maksimeremeev.com)
 #
 
-import pickle
+import numpy as np
+
+from complexity.tf_table import TermFrequencyTable
 
 
 class LexicalCounterComplexityFunction():
-    def __init__(self, tf_path):
-        self.tfs = pickle.load(open(tf_path, 'rb'))
-    
+    """
+    :Description: scores the tokens with their negated term frequencies
+    :param tf_path: path to the term frequency table saved by :meth:`TermFrequencyTable.save`, which is
+     memory-mapped and shared by the processes, or to the pickled dictionary of the term frequencies
+    :type tf_path: str
+    :param oov_score: score of the tokens absent from the table. If None, such tokens raise ``KeyError``,
+     defaults to None
+    :type oov_score: float, optional
+    """
+    def __init__(self, tf_path, oov_score=None):
+        self.tf_path = tf_path
+        self.oov_score = oov_score
+        self.tfs = TermFrequencyTable.open(tf_path)
+
+    def __getstate__(self):
+        if self.tf_path is None:
+            return dict(tfs=dict(self.tfs.items()))
+        return dict(tf_path=self.tf_path, oov_score=self.oov_score)
+
+    def __setstate__(self, state):
+        if 'tf_path' in state:
+            self.__init__(**state)
+            return
+        # pickled before the table, with the dictionary of the term frequencies in the state
+        self.tf_path = None
+        self.oov_score = state.get('oov_score')
+        self.tfs = TermFrequencyTable.build(state['tfs'])
+
     def score(self, token):
-        return -self.tfs[token]
+        return self.complexity([token]).tolist()[0]
 
     def complexity(self, tokens):
-        return [self.score(token) for token in tokens]
+        counts, found = self.tfs.lookup(tokens)
+        scores = -counts
+        if not found.all():
+            if self.oov_score is None:
+                raise KeyError(tokens[int(np.argmin(found))])
+            scores = np.where(found, scores, self.oov_score)
+        return scores
@@ -2,20 +2,62 @@
 # Created by maks5507 (me@maksimeremeev.com)
 #
 
+import numpy as np
+
 
 class DistanceComplexityFunction:
+    """
+    :Description: scores each token occurrence with the negated distance to the previous occurrence of the same
+     token, or for the first occurrence, with the distance to the last one wrapped around the end of the text.
+     Tokens are grouped by the stable sort of their integer ids, so the distances are counted with array
+     operations instead of a Python loop
+    """
+    accepts_ids = True
+
+    @staticmethod
+    def encode(tokens):
+        """
+        :Description: maps the tokens to integer ids, equal for equal tokens
+        :param tokens: tokens or their ids
+        :type tokens: list or np.ndarray
+        """
+        if isinstance(tokens, np.ndarray) and tokens.dtype.kind in 'iu':
+            return tokens
+        index = {}
+        return np.fromiter((index.setdefault(token, len(index)) for token in tokens), dtype=np.int64,
+                           count=len(tokens))
+
     def complexity(self, tokens):
-        total = len(tokens)
-        complexities = []
-        last_position = {}
-        for i in range(total):
-            if tokens[i] not in last_position:
-                last_position[tokens[i]] = i
-                complexities.append(-1)
-            else:
-                complexities.append(i - last_position[tokens[i]])
-                last_position[tokens[i]] = i
-        for i in range(total):
-            if complexities[i] == -1:
-                complexities[i] = total - last_position[tokens[i]] + i
-        return [-score for score in complexities]
+        """
+        :Description: returns the array of scores of the tokens of a single text
+        :param tokens: tokens or their integer ids
+        :type tokens: list or np.ndarray
+        """
+        ids = self.encode(tokens)
+        total = len(ids)
+        order = np.argsort(ids, kind='stable')
+        grouped = ids[order]
+        starts = np.ones(total, dtype=bool)
+        starts[1:] = grouped[1:] != grouped[:-1]
+        return self.__scores(order, starts, total)
+
+    @staticmethod
+    def __scores(order, starts, total):
+        """
+        :Description: counts the scores given the positions of the occurrences grouped by token, in the ascending
+         order within each group
+        :param order: positions of the grouped occurrences
+        :param starts: mask of the first occurrences of the groups
+        :param total: length of the text
+        """
+        size = len(order)
+        if size == 0:
+            return np.zeros(0, dtype=np.int64)
+        distances = np.empty(size, dtype=np.int64)
+        distances[1:] = order[1:] - order[:-1]
+        first = np.flatnonzero(starts)
+        last = np.append(first[1:], size) - 1
+        distances[first] = total - order[last] + order[first]
+        scores = np.empty(size, dtype=np.int64)
+        scores[order] = -distances
+        return scores
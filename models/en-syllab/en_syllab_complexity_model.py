@@ -17,9 +17,12 @@ if __name__ == "__main__":
     parser.add_argument('-j', '--jobs', nargs='*', help='number of parallel jobs')
     parser.add_argument('-n', '--name', nargs='*', help='name of the model')
     parser.add_argument('-s', '--stopwords', nargs='*', help='path to stopwords.txt')
+    parser.add_argument('-t', '--table', nargs='*', default=[None],
+                        help='path to the syllable table built by tokenizers/syllables.py')
     args = parser.parse_args()
 
-    syllab_tokenizer = en_syllab_tokenizer.EnSyllabTokenizer(stopwords=args.stopwords[0])
+    syllab_tokenizer = en_syllab_tokenizer.EnSyllabTokenizer(stopwords=args.stopwords[0],
+                                                             table_path=args.table[0])
     syllab_complexity_function = distance_cf.DistanceComplexityFunction()
     model = complexity_model.ComplexityModel(syllab_tokenizer, syllab_complexity_function)
     model.fit(args.path[0], use_preproc=False, n_jobs=args.jobs[0])
@@ -6,6 +6,7 @@ from . import pathmagic
 pathmagic.add_to_path(2)
 
 from complexity import complexity_model
+from complexity import tf_table
 from tokenizers import word_tokenizer
 from functions import counter_cf
 
@@ -17,13 +18,23 @@ if __name__ == "__main__":
     parser.add_argument('-p', '--path', nargs='*', help='path to reference collection')
     parser.add_argument('-j', '--jobs', nargs='*', help='number of parallel jobs')
     parser.add_argument('-n', '--name', nargs='*', help='name of the model')
-    parser.add_argument('-t', '--tf', nargs='*', help='path to tf pickle dump')
+    parser.add_argument('-t', '--tf', nargs='*', help='path to tf table or tf pickle dump')
+    parser.add_argument('-o', '--oov', nargs='*', type=float, default=[None],
+                        help='score of the tokens absent from the tf table, raises if omitted')
     parser.add_argument('-s', '--stopwords', nargs='*', help='path to stopwords.txt')
+    parser.add_argument('-b', '--build', action='store_true',
+                        help='build the tf table from the reference collection into --tf along with the model')
     args = parser.parse_args()
 
     word_tokenizer = word_tokenizer.WordTokenizer(stopwords=args.stopwords[0])
-    lexical_complexity_function = counter_cf.LexicalCounterComplexityFunction(args.tf[0])
+    if args.build:
+        table = tf_table.TermFrequencyTable.fit(args.path[0], word_tokenizer, n_jobs=args.jobs[0], use_preproc=False)
+        table.save(args.tf[0])
+    lexical_complexity_function = counter_cf.LexicalCounterComplexityFunction(args.tf[0], oov_score=args.oov[0])
     model = complexity_model.ComplexityModel(word_tokenizer, lexical_complexity_function, alphabet='reduced')
-    model.fit(args.path[0], use_preproc=False, n_jobs=args.jobs[0])
+    if args.build:
+        model.set_distributions(table.counter_distributions())
+    else:
+        model.fit(args.path[0], use_preproc=False, n_jobs=args.jobs[0])
 
     model.dump(path='.', model_name=args.name[0])
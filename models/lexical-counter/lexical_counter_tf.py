@@ -0,0 +1,24 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from . import pathmagic
+pathmagic.add_to_path(2)
+
+from complexity import tf_table
+from tokenizers import word_tokenizer
+
+import argparse
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--path', nargs='*', help='path to reference collection')
+    parser.add_argument('-j', '--jobs', nargs='*', help='number of parallel jobs')
+    parser.add_argument('-o', '--output', nargs='*', help='path to the directory to save the tf table to')
+    parser.add_argument('-s', '--stopwords', nargs='*', help='path to stopwords.txt')
+    args = parser.parse_args()
+
+    word_tokenizer = word_tokenizer.WordTokenizer(stopwords=args.stopwords[0])
+    table = tf_table.TermFrequencyTable.fit(args.path[0], word_tokenizer, n_jobs=args.jobs[0], use_preproc=False)
+    table.save(args.output[0])
@@ -0,0 +1,42 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from . import pathmagic
+pathmagic.add_to_path(2)
+
+from complexity import complexity_model
+from complexity import pipeline
+from tokenizers import word_tokenizer
+from tokenizers import letters_tokenizer
+from functions import distance_cf
+from functions import length_cf
+from functions import counter_cf
+
+import argparse
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--path', nargs='*', help='path to reference collection')
+    parser.add_argument('-j', '--jobs', nargs='*', help='number of parallel jobs')
+    parser.add_argument('-t', '--tf', nargs='*', help='path to tf pickle dump, the counter model is skipped if omitted')
+    parser.add_argument('-s', '--stopwords', nargs='*', help='path to stopwords.txt')
+    args = parser.parse_args()
+
+    word_tokenizer = word_tokenizer.WordTokenizer(stopwords=args.stopwords[0])
+    letter_tokenizer = letters_tokenizer.LetterTokenizer(stopwords=args.stopwords[0])
+    models = {
+        'lexical-distance': complexity_model.ComplexityModel(word_tokenizer, distance_cf.DistanceComplexityFunction()),
+        'lexical-length': complexity_model.ComplexityModel(word_tokenizer, length_cf.LengthComplexityFunction(),
+                                                           alphabet='reduced'),
+        'letters': complexity_model.ComplexityModel(letter_tokenizer, distance_cf.DistanceComplexityFunction()),
+    }
+    if args.tf:
+        models['lexical-counter'] = complexity_model.ComplexityModel(
+            word_tokenizer, counter_cf.LexicalCounterComplexityFunction(args.tf[0]), alphabet='reduced')
+
+    complexity_pipeline = pipeline.ComplexityPipeline(models)
+    complexity_pipeline.fit(args.path[0], use_preproc=False, n_jobs=args.jobs[0])
+
+    complexity_pipeline.dump(path='.')
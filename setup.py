@@ -22,6 +22,9 @@ setup_kwargs = dict(
     ],
     setup_requires=[
     ],
+    extras_require={
+        'zstd': ['zstandard']
+    },
 
     cmdclass={'build_py': build_py.build_py},
 )
@@ -0,0 +1,7 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from .arrays import save_array
+from .string_pool import StringPool
+from .hash_index import HashIndex, hash_tokens
@@ -0,0 +1,28 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+import tempfile
+
+import numpy as np
+
+
+def save_array(filename, array):
+    """
+    :Description: saves the array as a ``.npy`` file through a temporary file of the same directory replacing the
+     target at once. Arrays memory-mapped from the target keep reading the replaced file, so a store loaded with
+     ``mmap`` can be saved back into its own directory
+    :param filename: path to the ``.npy`` file
+    :type filename: str
+    :param array: array to save
+    :type array: np.ndarray
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            np.save(f, array)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
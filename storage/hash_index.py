@@ -0,0 +1,129 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+
+import numpy as np
+
+from .arrays import save_array
+
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+
+def hash_tokens(tokens, chunk_size=1 << 16):
+    """
+    :Description: returns the 64-bit FNV-1 hashes of the code points of the strings, counted column by column over
+     the fixed-width unicode arrays of the strings. The strings are hashed in chunks of similar lengths, so a few
+     long strings do not widen the arrays of all the others
+    :param tokens: strings to hash
+    :type tokens: list[str]
+    :param chunk_size: number of strings hashed at once, defaults to 65536
+    :type chunk_size: int, optional
+    """
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    order = np.argsort(lengths, kind='stable')
+    hashes = np.full(len(tokens), FNV_OFFSET, dtype=np.uint64)
+    for start in range(0, len(tokens), chunk_size):
+        chunk = order[start:start + chunk_size]
+        strings = np.asarray([tokens[i] for i in chunk.tolist()], dtype=str)
+        width = strings.dtype.itemsize // 4
+        if width == 0:
+            continue
+        code_points = strings.view(np.uint32).reshape(len(strings), width).astype(np.uint64)
+        chunk_hashes = hashes[chunk]
+        for column in range(width):
+            present = code_points[:, column] != 0
+            chunk_hashes[present] = (chunk_hashes[present] * FNV_PRIME) ^ code_points[present, column]
+        hashes[chunk] = chunk_hashes
+    return hashes
+
+
+class HashIndex:
+    """
+    :Description: index of the strings of a :class:`StringPool` by their sorted 64-bit hashes. Every hit of the
+     hashes is checked against the string stored in the pool, so absent strings colliding with the stored ones are
+     not found
+    :param hashes: sorted hashes of the strings
+    :type hashes: np.ndarray
+    :param strings: indexed strings
+    :type strings: StringPool
+    :param positions: positions of the strings in the pool in the order of their hashes, None if the pool itself is
+     in the order of the hashes, defaults to None
+    :type positions: np.ndarray, optional
+    """
+    def __init__(self, hashes, strings, positions=None):
+        self.hashes = hashes
+        self.strings = strings
+        self.positions = positions
+
+    @staticmethod
+    def build(strings):
+        """
+        :Description: indexes the strings of the pool in their order
+        :param strings: strings to index
+        :type strings: StringPool
+        """
+        hashes = hash_tokens(list(strings))
+        positions = np.argsort(hashes, kind='stable')
+        hashes = hashes[positions]
+        if len(hashes) > 1 and np.any(hashes[1:] == hashes[:-1]):
+            raise ValueError('hash collision between the indexed strings')
+        return HashIndex(hashes, strings, positions)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def find(self, tokens):
+        """
+        :Description: returns the positions of the tokens in the pool, ``-1`` for the absent ones. The tokens are
+         deduplicated, the hashes of the distinct tokens are searched with a single ``np.searchsorted`` call and
+         only the hits are compared with the stored strings. Tokens other than strings are never found
+        :param tokens: tokens to look up
+        :type tokens: list
+        """
+        index = {}
+        inverse = np.fromiter((index.setdefault(token, len(index)) for token in tokens), dtype=np.int64,
+                              count=len(tokens))
+        distinct = list(index)
+        is_string = np.fromiter((isinstance(token, str) for token in distinct), dtype=bool, count=len(distinct))
+        hashes = hash_tokens([token if isinstance(token, str) else '' for token in distinct])
+        positions = np.full(len(distinct), -1, dtype=np.int64)
+        if len(self) > 0:
+            candidates = np.minimum(np.searchsorted(self.hashes, hashes), len(self) - 1)
+            hits = (np.asarray(self.hashes)[candidates] == hashes) & is_string
+            candidates = candidates if self.positions is None else np.asarray(self.positions)[candidates]
+            for i in np.flatnonzero(hits).tolist():
+                if self.strings.encoded(candidates[i]) == distinct[i].encode('utf-8'):
+                    positions[i] = candidates[i]
+        return positions[inverse]
+
+    def save(self, path, name):
+        """
+        :Description: saves the index as ``name-hashes.npy`` and ``name-positions.npy`` into the directory, the
+         pool is saved separately
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the index
+        :type name: str
+        """
+        save_array(os.path.join(path, name + '-hashes.npy'), self.hashes)
+        save_array(os.path.join(path, name + '-positions.npy'), self.positions)
+
+    @staticmethod
+    def load(path, name, strings, mmap=True):
+        """
+        :Description: loads the index saved by :meth:`save`
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the index
+        :type name: str
+        :param strings: pool the index was built for
+        :type strings: StringPool
+        :param mmap: flag indicating whether to memory-map the index instead of reading it, defaults to True
+        :type mmap: bool, optional
+        """
+        mmap_mode = 'r' if mmap else None
+        return HashIndex(np.load(os.path.join(path, name + '-hashes.npy'), mmap_mode=mmap_mode), strings,
+                         np.load(os.path.join(path, name + '-positions.npy'), mmap_mode=mmap_mode))
@@ -0,0 +1,98 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+
+import numpy as np
+
+from .arrays import save_array
+
+
+class StringPool:
+    """
+    :Description: immutable sequence of strings stored as a single utf-8 byte array and an array of offsets.
+     If the strings are sorted, :meth:`find` looks them up with the binary search. Saved pools are memory-mapped
+     on load, so processes opening the same pool share its pages through the OS page cache
+    :param data: concatenated utf-8 encoded strings
+    :type data: np.ndarray
+    :param offsets: array of ``len(strings) + 1`` boundaries of the strings in ``data``
+    :type offsets: np.ndarray
+    """
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def build(strings, sort=False):
+        """
+        :Description: builds the pool from the strings
+        :param strings: strings to store
+        :type strings: list[str]
+        :param sort: flag indicating whether to sort the strings in the order of their utf-8 encoding, which is
+         the code point order, so that the pool supports :meth:`find`, defaults to False
+        :type sort: bool, optional
+        """
+        encoded = [string.encode('utf-8') for string in strings]
+        if sort:
+            encoded.sort()
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return StringPool(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.encoded(i).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def encoded(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def find(self, string):
+        """
+        :Description: returns the position of the string in the sorted pool, ``-1`` if it is absent
+        :param string: string to look up
+        :type string: str
+        """
+        key = string.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.encoded(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.encoded(low) == key:
+            return low
+        return -1
+
+    def save(self, path, name):
+        """
+        :Description: saves the pool as ``name-data.npy`` and ``name-offsets.npy`` into the directory
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the pool
+        :type name: str
+        """
+        save_array(os.path.join(path, name + '-data.npy'), self.data)
+        save_array(os.path.join(path, name + '-offsets.npy'), self.offsets)
+
+    @staticmethod
+    def load(path, name, mmap=True):
+        """
+        :Description: loads the pool saved by :meth:`save`
+        :param path: path to the directory
+        :type path: str
+        :param name: name of the pool
+        :type name: str
+        :param mmap: flag indicating whether to memory-map the pool instead of reading it, defaults to True
+        :type mmap: bool, optional
+        """
+        mmap_mode = 'r' if mmap else None
+        return StringPool(np.load(os.path.join(path, name + '-data.npy'), mmap_mode=mmap_mode),
+                          np.load(os.path.join(path, name + '-offsets.npy'), mmap_mode=mmap_mode))
@@ -0,0 +1,3 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
@@ -0,0 +1,49 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+import random
+
+
+class WhitespaceTokenizer:
+    """
+    :Description: tokenizer splitting the text by whitespace, importable by the spawned workers of the tests
+    """
+    def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False, check_length=True,
+                 check_stopwords=True):
+        return text.split()
+
+
+class CaseTokenizer(WhitespaceTokenizer):
+    """
+    :Description: whitespace tokenizer configured to lowercase the tokens, keyed by its plain attributes
+    """
+    def __init__(self, lower=False):
+        self.lower = lower
+
+    def tokenize(self, text, **kwargs):
+        tokens = super().tokenize(text, **kwargs)
+        return [token.lower() for token in tokens] if self.lower else tokens
+
+
+def generate_texts(documents=60, length=200, vocabulary_size=300, seed=0):
+    """
+    :Description: returns the texts of Zipf-distributed words of a small vocabulary
+    """
+    rng = random.Random(seed)
+    words = ['w{}'.format(i) for i in range(vocabulary_size)]
+    weights = [1 / (i + 1) for i in range(vocabulary_size)]
+    return [' '.join(rng.choices(words, weights, k=rng.randint(1, length))) for _ in range(documents)]
+
+
+def write_corpus(path, texts):
+    """
+    :Description: writes the texts as ``.txt`` files of the directory, a few of them into a nested directory
+    """
+    os.makedirs(os.path.join(path, 'nested'), exist_ok=True)
+    for i, text in enumerate(texts):
+        folder = os.path.join(path, 'nested') if i % 5 == 0 else path
+        with open(os.path.join(folder, '{}.txt'.format(i)), 'w') as f:
+            f.write(text)
+    return path
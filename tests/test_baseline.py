@@ -0,0 +1,117 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import itertools
+
+import numpy as np
+import pytest
+
+from complexity import ComplexityModel
+from functions import DistanceComplexityFunction, LengthComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+
+def baseline_fit(texts, tokenizer, complexity_function, alphabet):
+    distributions = {}
+    for text in texts:
+        tokens = tokenizer.tokenize(text)
+        complexities = complexity_function.complexity(tokens)
+        for token, score in zip(tokens, complexities):
+            row = distributions.setdefault(token if alphabet == 'full' else None, {})
+            row[score] = row.get(score, 0) + 1
+    return distributions
+
+
+def baseline_quantile(distribution, gamma):
+    gamma = 1 - gamma
+    size = sum(distribution.values())
+    current_amount = 0
+    prev_score = 1e18
+    sorted_distribution = sorted(distribution.items(), key=lambda item: item[0], reverse=True)
+    for score, amount in sorted_distribution:
+        if current_amount + amount > size * gamma:
+            return prev_score
+        prev_score = score
+        current_amount += amount
+    return sorted_distribution[-1][0]
+
+
+def baseline_predict(distributions, texts, tokenizer, complexity_function, alphabet, gamma=0.95, weights='mean',
+                     p=1, exp_weights=False, weights_min_shift=False, normalize=False):
+    """
+    :Description: token-by-token scoring of the original implementation, zero total weights give ``inf`` or ``nan``
+     as for the numpy sums of the original ``exp_weights``
+    """
+    quantiles = {token: baseline_quantile(distribution, gamma) for token, distribution in distributions.items()}
+    min_value = min(min(distribution) for distribution in distributions.values())
+    results = []
+    for text in texts:
+        tokens = tokenizer.tokenize(text)
+        nd = len(tokens)
+        complexity, total_score = 0, 0
+        for token, score in zip(tokens, complexity_function.complexity(tokens)):
+            score = int(score)
+            weight = 0
+            if weights == 'count':
+                weight = 1
+            if weights == 'mean':
+                weight = (score + abs(min_value) + 1) / nd if weights_min_shift else score / nd
+            if weights == 'total':
+                weight = score + abs(min_value) + 1 if weights_min_shift else score
+            quantile = quantiles.get(token if alphabet == 'full' else None, score)
+            if weights == 'excessive':
+                weight = score - quantile
+            if weights == 'excessive_mean':
+                weight = (score - quantile) / nd
+            if exp_weights and alphabet == 'full':
+                weight = np.tanh(weight)
+            complexity += weight ** p * (score >= quantile)
+            total_score += weight ** p
+        with np.errstate(divide='ignore', invalid='ignore'):
+            results += [np.float64(complexity) / total_score if normalize else complexity]
+    return results
+
+
+CASES = [('full', DistanceComplexityFunction()), ('full', LengthComplexityFunction()),
+         ('reduced', LengthComplexityFunction())]
+PARAMETERS = [dict(weights=weights, **extra) for weights, extra in itertools.product(
+    ['count', 'mean', 'total', 'excessive', 'excessive_mean'],
+    [{}, dict(p=2), dict(exp_weights=True), dict(exp_weights=True, normalize=True), dict(weights_min_shift=True),
+     dict(normalize=True), dict(gamma=0.5)])]
+
+
+@pytest.fixture(scope='module')
+def texts():
+    return generate_texts()
+
+
+@pytest.mark.parametrize('alphabet, complexity_function', CASES)
+def test_fit_matches_baseline(texts, alphabet, complexity_function):
+    model = ComplexityModel(WhitespaceTokenizer(), complexity_function, alphabet=alphabet)
+    model.fit(iter(texts), n_jobs=2)
+    assert model.distributions.to_dict() == baseline_fit(texts, WhitespaceTokenizer(), complexity_function, alphabet)
+
+
+@pytest.mark.parametrize('alphabet, complexity_function', CASES)
+def test_predict_matches_baseline(texts, alphabet, complexity_function):
+    model = ComplexityModel(WhitespaceTokenizer(), complexity_function, alphabet=alphabet)
+    model.fit(iter(texts[:40]), n_jobs=2)
+    distributions = baseline_fit(texts[:40], WhitespaceTokenizer(), complexity_function, alphabet)
+    queries = texts[40:] + ['unknown1 unknown2 unknown1', 'w0']
+    for parameters in PARAMETERS:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores, _ = model.predict(queries, **parameters)
+        expected = baseline_predict(distributions, queries, WhitespaceTokenizer(), complexity_function, alphabet,
+                                    **parameters)
+        np.testing.assert_allclose(np.array(scores, dtype=np.float64), np.array(expected, dtype=np.float64),
+                                   rtol=1e-12, atol=0, err_msg=str(parameters))
+
+
+def test_zero_total_weight_is_not_an_error():
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+    model.fit(iter(['a b', 'a b']), n_jobs=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores, _ = model.predict(['unknown1 unknown2'], weights='excessive', exp_weights=True, normalize=True)
+    assert np.isnan(scores[0])
@@ -0,0 +1,110 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import functools
+import gzip
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from complexity import ComplexityModel, corpus
+from complexity.profiling import ProfileCollector
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts, write_corpus
+
+
+@pytest.fixture(scope='module')
+def packed(tmp_path_factory):
+    texts = generate_texts(documents=40) + ['ёлка ёж ёлка 木 木', 'w1\tw2  w3', '"quoted" \\ back\\slash']
+    source = write_corpus(str(tmp_path_factory.mktemp('source')), texts)
+    output = str(tmp_path_factory.mktemp('packed'))
+    corpus.pack(source, output, shard_size=4096)
+    return source, output
+
+
+def fit(reference_corpus, hook=None):
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+    model.fit(reference_corpus, n_jobs=2, hook=hook)
+    return model
+
+
+def write_packed(path, texts, malformed):
+    lines = [json.dumps(dict(id=str(i), text=text)).encode('utf-8') for i, text in enumerate(texts)]
+    lines.insert(len(lines) // 2, malformed)
+    data = b'\n'.join(lines) + b'\n'
+    if path.endswith('.tar'):
+        with tarfile.open(path, 'w') as archive:
+            for i, text in enumerate([text.encode('utf-8') for text in texts] + [malformed]):
+                info = tarfile.TarInfo('{}.txt'.format(i))
+                info.size = len(text)
+                archive.addfile(info, io.BytesIO(text))
+    elif path.endswith('.gz'):
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+@pytest.mark.parametrize('min_shard_size', [1, 64, 1000, 1 << 20])
+def test_byte_range_shards_cover_documents_once(packed, min_shard_size):
+    source, output = packed
+    shards = corpus.plan_shards(output, n_jobs=4, min_shard_size=min_shard_size)
+    if min_shard_size < 1000:
+        assert len(shards) > len(corpus.packed_files(output))
+
+    documents = [document for shard in shards for document in corpus.read_shard(shard)]
+    expected = [(os.path.relpath(doc_id, source), text) for doc_id, text in corpus.read_corpus(source)]
+    assert sorted(documents) == sorted(expected)
+
+
+def test_every_split_point(tmp_path):
+    path = str(tmp_path / 'part.jsonl')
+    with open(path, 'wb') as f:
+        f.write('"ёлка 木"\n\n{"id": "a", "text": "w1 w2"}\n"w3"'.encode('utf-8'))
+    expected = list(corpus.read_shard(corpus.Shard(path, 0, None)))
+    size = os.path.getsize(path)
+
+    assert [text for _, text in expected] == ['ёлка 木', 'w1 w2', 'w3']
+    for split in range(size + 1):
+        documents = [document for shard in [corpus.Shard(path, 0, split), corpus.Shard(path, split, size)]
+                     for document in corpus.read_shard(shard)]
+        assert documents == expected, split
+
+
+def test_sharded_fit_matches_directory_fit(packed, monkeypatch):
+    source, output = packed
+    monkeypatch.setattr(corpus, 'plan_shards', functools.partial(corpus.plan_shards, min_shard_size=64))
+
+    assert fit(output).distributions.to_dict() == fit(source).distributions.to_dict()
+
+
+MALFORMED = [b'{"text": "w1 w2', b'{"id": "no-text"}', b'"w1 \xff\xfe w2"', b'[1, 2]']
+
+
+@pytest.mark.parametrize('suffix,malformed', [(suffix, malformed) for suffix in ['.jsonl', '.jsonl.gz']
+                                              for malformed in MALFORMED] + [('.tar', b'w1 \xff\xfe w2')])
+def test_malformed_document_costs_one_document(tmp_path, monkeypatch, suffix, malformed):
+    texts = generate_texts(documents=1000, length=20)
+    write_packed(str(tmp_path / ('part' + suffix)), texts, malformed)
+    monkeypatch.setattr(corpus, 'plan_shards', functools.partial(corpus.plan_shards, min_shard_size=4096))
+    collector = ProfileCollector()
+    model = fit(str(tmp_path), hook=collector)
+
+    counts = collector.report['total']['counts']
+    assert (counts['documents'], counts['errors']) == (1000, 1)
+    assert model.distributions.to_dict() == fit(iter(texts)).distributions.to_dict()
+    with pytest.raises(Exception):
+        list(corpus.read_corpus(str(tmp_path)))
+
+
+def test_read_task_is_lazy(packed):
+    _, output = packed
+    documents = corpus.read_task(corpus.Shard(corpus.packed_files(output)[0], 0, None))
+    assert not isinstance(documents, list)
+    assert isinstance(next(documents), tuple)
@@ -0,0 +1,61 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import pytest
+
+from complexity import ComplexityModel
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+
+@pytest.fixture(scope='module')
+def texts():
+    return generate_texts(documents=60) + ['ёлка ёж ёлка 木 木', 'w0 only-second-half']
+
+
+def fit(texts, alphabet='full', relative_accuracy=None):
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction(), alphabet=alphabet,
+                            relative_accuracy=relative_accuracy)
+    model.fit(iter(texts), n_jobs=1)
+    return model
+
+
+def prepare(model, texts):
+    model.distributions.precompute(0.95)
+    model.predict(texts[:3], weights_min_shift=True)
+    return model
+
+
+def assert_same(model, full, texts):
+    assert model.distributions.to_dict() == full.distributions.to_dict()
+    assert model.min_value == full.min_value
+    assert sorted(model.distributions.precomputed) == [0.95]
+    precomputed = model.distributions.precomputed[0.95].tolist()
+    assert precomputed == [full.distributions.quantile(token, 0.95) for token in model.distributions]
+    for parameters in [dict(), dict(gamma=0.5), dict(weights_min_shift=True)]:
+        assert model.predict(texts, **parameters)[0] == full.predict(texts, **parameters)[0]
+
+
+@pytest.mark.parametrize('alphabet,relative_accuracy', [('full', None), ('reduced', None), ('full', 0.01)])
+def test_partial_fit_matches_fit(texts, alphabet, relative_accuracy):
+    full = prepare(fit(texts, alphabet, relative_accuracy), texts)
+    model = prepare(fit(texts[:30], alphabet, relative_accuracy), texts)
+    model.partial_fit(iter(texts[30:]), n_jobs=2)
+
+    assert_same(model, full, texts)
+
+
+@pytest.mark.parametrize('alphabet,relative_accuracy', [('full', None), ('reduced', None), ('full', 0.01)])
+def test_merge_matches_fit(texts, alphabet, relative_accuracy):
+    full = prepare(fit(texts, alphabet, relative_accuracy), texts)
+    model = prepare(fit(texts[:30], alphabet, relative_accuracy), texts)
+    model.merge(fit(texts[30:], alphabet, relative_accuracy))
+
+    assert_same(model, full, texts)
+
+
+def test_merge_rejects_different_models(texts):
+    with pytest.raises(ValueError):
+        fit(texts[:30]).merge(fit(texts[30:], alphabet='reduced'))
@@ -0,0 +1,108 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+
+import pytest
+
+from complexity import ComplexityModel, parallel
+from complexity.accumulators import DistributionAccumulator
+from complexity.profiling import ProfileCollector
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+
+class FailingTokenizer(WhitespaceTokenizer):
+    def tokenize(self, text, **kwargs):
+        if text.startswith('fail'):
+            raise ValueError(text)
+        if text.startswith('exit'):
+            os._exit(3)
+        return super().tokenize(text, **kwargs)
+
+
+class FailingStartAccumulator(DistributionAccumulator):
+    def start(self):
+        raise ValueError('broken accumulator')
+
+
+def accumulator(tokenizer):
+    return DistributionAccumulator(tokenizer, DistanceComplexityFunction(), 'full', {})
+
+
+@pytest.mark.parametrize('hook', [None, ProfileCollector()])
+def test_worker_start_failure_is_raised(hook):
+    failing = FailingStartAccumulator(WhitespaceTokenizer(), DistanceComplexityFunction(), 'full', {})
+    batches = parallel.plan(iter(generate_texts(documents=20)), 2)
+    with pytest.raises(RuntimeError, match='broken accumulator'):
+        parallel.run(batches, failing, 2, hook=hook)
+
+
+def test_worker_exit_is_raised():
+    texts = generate_texts(documents=20) + ['exit now']
+    with pytest.raises(RuntimeError, match='exited with code 3'):
+        parallel.run(parallel.plan(iter(texts), 2), accumulator(FailingTokenizer()), 2)
+
+
+def test_document_errors_are_counted():
+    texts = generate_texts(documents=20)
+    hook = ProfileCollector()
+    model = ComplexityModel(FailingTokenizer(), DistanceComplexityFunction())
+    model.fit(iter(texts + ['fail 1', 'fail 2']), n_jobs=2, hook=hook)
+
+    expected = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+    expected.fit(iter(texts), n_jobs=2)
+    assert hook.report['total']['counts']['errors'] == 2
+    assert model.distributions.to_dict() == expected.distributions.to_dict()
+
+
+def test_bytes_are_counted():
+    texts = generate_texts(documents=10) + ['ёлка ёж 木']
+    for predict in (False, True):
+        hook = ProfileCollector()
+        model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+        model.fit(iter(texts), n_jobs=2, hook=None if predict else hook)
+        if predict:
+            model.predict(texts, hook=hook)
+        assert hook.report['total']['counts']['bytes'] == sum(len(text.encode('utf-8')) for text in texts)
+
+
+class ConsumptionHook(ProfileCollector):
+    def __init__(self, consumed):
+        super().__init__()
+        self.consumed = consumed
+        self.first_progress = None
+
+    def progress(self, snapshot):
+        if self.first_progress is None:
+            self.first_progress = self.consumed[0]
+
+
+def test_predict_pool_is_reused_and_fed_lazily():
+    texts = generate_texts(documents=200, length=20)
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+    model.fit(iter(texts[:100]), n_jobs=2)
+    expected = model.predict(texts)
+    try:
+        consumed = [0]
+
+        def generate():
+            for text in texts:
+                consumed[0] += 1
+                yield text
+
+        workers = []
+        for _ in range(2):
+            hook = ConsumptionHook(consumed)
+            consumed[0] = 0
+            assert model.predict(generate(), n_jobs=2, batch_size=4, hook=hook, max_pending_batches=1) == expected
+            assert hook.first_progress <= (1 * 2 + 1) * 4
+            workers += [sorted(snapshot['worker'] for snapshot in hook.report['workers'])]
+        assert workers[0] == workers[1]
+
+        model.partial_fit(iter(texts[100:]), n_jobs=2)
+        assert model.predict(texts, n_jobs=2) == model.predict(texts)
+    finally:
+        model.close()
@@ -0,0 +1,123 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from complexity import ComplexityModel, PooledVocabulary, TermFrequencyTable
+from complexity.distributions import DistributionStore
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+
+@pytest.fixture(scope='module')
+def texts():
+    return generate_texts(documents=30) + ['ёлка ёж ёлка 木 木']
+
+
+def fit(texts, alphabet='full'):
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction(), alphabet=alphabet)
+    model.fit(iter(texts), n_jobs=1)
+    return model
+
+
+@pytest.mark.parametrize('alphabet', ['full', 'reduced'])
+def test_dump_round_trip(tmp_path, texts, alphabet):
+    model = fit(texts, alphabet)
+    model.dump(path=str(tmp_path), model_name='model', gammas=(0.5, 0.95))
+    loaded = ComplexityModel.load(str(tmp_path / 'model'), WhitespaceTokenizer(), DistanceComplexityFunction())
+
+    assert loaded.distributions.to_dict() == model.distributions.to_dict()
+    assert sorted(loaded.distributions.precomputed) == [0.5, 0.95]
+    assert isinstance(loaded.distributions.vocabulary, PooledVocabulary) == (alphabet == 'full')
+    queries = texts[:5] + ['ёлка unknown 木']
+    assert loaded.predict(queries)[0] == model.predict(queries)[0]
+
+
+@pytest.mark.parametrize('alphabet', ['full', 'reduced'])
+def test_dump_in_place(tmp_path, texts, alphabet):
+    model = fit(texts, alphabet)
+    model.dump(path=str(tmp_path), model_name='model')
+    loaded = ComplexityModel.load(str(tmp_path / 'model'), WhitespaceTokenizer(), DistanceComplexityFunction())
+    assert isinstance(loaded.distributions.scores, np.memmap)
+
+    loaded.dump(path=str(tmp_path), model_name='model', gammas=(0.5, 0.95))
+    assert loaded.distributions.to_dict() == model.distributions.to_dict()
+    reloaded = ComplexityModel.load(str(tmp_path / 'model'), WhitespaceTokenizer(), DistanceComplexityFunction())
+    assert reloaded.distributions.to_dict() == model.distributions.to_dict()
+    assert sorted(reloaded.distributions.precomputed) == [0.5, 0.95]
+    assert reloaded.predict(texts[:5])[0] == model.predict(texts[:5])[0]
+    assert not [name for name in os.listdir(str(tmp_path / 'model')) if name.endswith('.tmp')]
+
+
+def test_tf_table_save_in_place(tmp_path):
+    TermFrequencyTable.build({'w0': 3, 'ёлка': 1, '木': 2}).save(str(tmp_path))
+    loaded = TermFrequencyTable.load(str(tmp_path))
+    loaded.save(str(tmp_path))
+
+    assert dict(TermFrequencyTable.load(str(tmp_path)).items()) == {'w0': 3, 'ёлка': 1, '木': 2}
+
+
+def test_pooled_vocabulary_lookup(tmp_path, texts):
+    store = fit(texts).distributions
+    store.save(str(tmp_path))
+    loaded = DistributionStore.load(str(tmp_path))
+
+    assert not os.path.exists(str(tmp_path / 'tokens.bin'))
+    assert list(loaded) == list(store)
+    assert 'ёлка' in loaded and 'unknown' not in loaded and None not in loaded
+    tokens = ['木', 'unknown', 'w0', '木', None]
+    np.testing.assert_array_equal(loaded.ids(tokens, intern_unknown=True), store.ids(tokens, intern_unknown=True))
+    with pytest.raises(KeyError):
+        loaded.row('unknown')
+    assert loaded.merge(store).to_dict() == store.merge(store).to_dict()
+
+
+def test_legacy_store_load(tmp_path, texts):
+    store = fit(texts).distributions
+    store.save(str(tmp_path))
+    with open(str(tmp_path / 'tokens.bin'), 'wb') as f:
+        pickle.dump(list(store.tokens), f)
+
+    loaded = DistributionStore.load(str(tmp_path))
+    assert not isinstance(loaded.vocabulary, PooledVocabulary)
+    assert loaded.to_dict() == store.to_dict()
+
+
+@pytest.mark.parametrize('alphabet', ['full', 'reduced'])
+def test_legacy_model_load(tmp_path, texts, alphabet):
+    model = fit(texts, alphabet)
+    distributions = model.distributions.to_dict()
+    if alphabet == 'reduced':
+        distributions = distributions[None]
+    path = str(tmp_path / 'parameters.bin')
+    with open(path, 'wb') as f:
+        pickle.dump({'alphabet': alphabet, 'distributions': distributions}, f)
+
+    loaded = ComplexityModel.load(path, WhitespaceTokenizer(), DistanceComplexityFunction())
+    assert loaded.distributions.to_dict() == model.distributions.to_dict()
+    assert loaded.predict(texts[:5])[0] == model.predict(texts[:5])[0]
+
+
+def test_loaded_store_pickles_by_path(tmp_path, texts):
+    store = fit(texts).distributions
+    store.precompute(0.95)
+    store.save(str(tmp_path))
+    loaded = DistributionStore.load(str(tmp_path))
+    loaded.precompute(0.5)
+
+    data = pickle.dumps(loaded)
+    assert len(data) < 1000 + loaded.precomputed[0.5].nbytes
+    unpickled = pickle.loads(data)
+    assert isinstance(unpickled.scores, np.memmap)
+    assert sorted(unpickled.precomputed) == [0.5, 0.95]
+    np.testing.assert_array_equal(unpickled.precomputed[0.5], loaded.precomputed[0.5])
+    assert unpickled.to_dict() == store.to_dict()
+
+    copied = pickle.loads(pickle.dumps(store))
+    assert copied.to_dict() == store.to_dict() and sorted(copied.precomputed) == [0.95]
@@ -0,0 +1,62 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import numpy as np
+
+from complexity import ComplexityModel, ComplexityPipeline, Spec
+from complexity.accumulators import DistributionAccumulator, PipelineAccumulator
+from functions import DistanceComplexityFunction, LengthComplexityFunction
+
+from .helpers import CaseTokenizer, WhitespaceTokenizer, generate_texts
+
+
+class CountingTokenizer(WhitespaceTokenizer):
+    calls = 0
+
+    def tokenize(self, text, **kwargs):
+        CountingTokenizer.calls += 1
+        return super().tokenize(text, **kwargs)
+
+
+def test_identical_tokenizers_share_tokenization():
+    texts = generate_texts(documents=20)
+    pipeline = ComplexityPipeline({'distance': ComplexityModel(CountingTokenizer(), DistanceComplexityFunction()),
+                                   'length': ComplexityModel(Spec(CountingTokenizer), LengthComplexityFunction())})
+    pipeline.fit(iter(texts), n_jobs=1)
+
+    CountingTokenizer.calls = 0
+    scores = pipeline.predict(texts)
+    assert CountingTokenizer.calls == len(texts)
+    for column, name in enumerate(pipeline):
+        np.testing.assert_array_equal(scores[:, column], pipeline[name].predict(texts)[0])
+
+
+def test_fit_groups_identical_tokenizers():
+    accumulator = PipelineAccumulator({
+        name: DistributionAccumulator(tokenizer, DistanceComplexityFunction(), 'full', {})
+        for name, tokenizer in [('a', CountingTokenizer()), ('b', Spec(CountingTokenizer)),
+                                ('c', WhitespaceTokenizer()), ('d', CaseTokenizer()),
+                                ('e', Spec(CaseTokenizer, lower=True)), ('f', CaseTokenizer(lower=False))]})
+    accumulator.start()
+    assert accumulator.groups == [['a', 'b'], ['c'], ['d', 'f'], ['e']]
+    assert accumulator.accumulators['a'].vocabulary is accumulator.accumulators['b'].vocabulary
+
+
+def test_differently_configured_tokenizers_are_not_grouped():
+    texts = [text.upper() for text in generate_texts(documents=30)]
+    models = {'upper': ComplexityModel(CaseTokenizer(), DistanceComplexityFunction()),
+              'lower': ComplexityModel(Spec(CaseTokenizer, lower=True), DistanceComplexityFunction()),
+              'same': ComplexityModel(CaseTokenizer(lower=True), LengthComplexityFunction())}
+    pipeline = ComplexityPipeline(models)
+    pipeline.fit(iter(texts), n_jobs=2)
+
+    for name, tokenizer, complexity_function in [('upper', CaseTokenizer(), DistanceComplexityFunction()),
+                                                 ('lower', CaseTokenizer(lower=True), DistanceComplexityFunction()),
+                                                 ('same', CaseTokenizer(lower=True), LengthComplexityFunction())]:
+        expected = ComplexityModel(tokenizer, complexity_function)
+        expected.fit(iter(texts), n_jobs=1)
+        assert pipeline[name].distributions.to_dict() == expected.distributions.to_dict()
+    scores = pipeline.predict(texts)
+    for column, name in enumerate(pipeline):
+        np.testing.assert_array_equal(scores[:, column], pipeline[name].predict(texts)[0])
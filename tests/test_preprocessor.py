@@ -0,0 +1,96 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import itertools
+import re
+from pathlib import Path
+
+import pytest
+
+tokenizers = pytest.importorskip('tokenizers', exc_type=ImportError)
+
+STOPWORDS = str(Path(__file__).absolute().parents[1] / 'data' / 'stopwords.txt')
+TEXTS = ["The cats were running and the dogs were barking at the running cats.\nIt's a well-known fact",
+         'Кошки бегали, а собаки лаяли на бегающих кошек. Ёлки-палки, -дефис и дефис- x',
+         'running runs ran cats cat caresses кошки кошка кошек ' * 3]
+
+
+def baseline_preproc(preprocessor, text, check_stopwords=True, check_length=True, use_lemm=False, use_stem=False):
+    s = re.sub("\n", r" ", text)
+    s = re.sub("'", r" ", s)
+    s = s.lower()
+    s = preprocessor.rgc.sub(" ", s)
+
+    final_agg = []
+    tf = {}
+    for token in preprocessor.tokenizer.tokenize(s):
+        if check_length and len(token) < 2:
+            continue
+        if token[-1] == '-' or token[0] == '-':
+            continue
+        if use_lemm:
+            token = preprocessor.lemmatizer.parse(token)[0].normal_form
+        if use_stem:
+            token = preprocessor.stemmer.stem(token)
+        if token not in preprocessor.stopwords or not check_stopwords:
+            tf[token] = tf.get(token, 0) + 1
+            final_agg.append(token)
+    return ' '.join(final_agg), tf
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    monkeypatch.setattr(tokenizers.Preprocessing, 'caches', {})
+
+
+@pytest.mark.parametrize('use_lemm,use_stem,check_stopwords,check_length',
+                         list(itertools.product([False, True], repeat=4)))
+def test_preproc_matches_baseline(use_lemm, use_stem, check_stopwords, check_length):
+    preprocessor = tokenizers.Preprocessing(STOPWORDS)
+    flags = dict(use_lemm=use_lemm, use_stem=use_stem, check_stopwords=check_stopwords, check_length=check_length)
+    for _ in range(2):
+        for text in TEXTS:
+            assert preprocessor.preproc(text, **flags) == baseline_preproc(preprocessor, text, **flags)
+
+
+def test_flags_do_not_share_entries():
+    preprocessor = tokenizers.Preprocessing(STOPWORDS)
+    for use_lemm, use_stem in [(True, False), (False, True), (True, True), (False, False), (True, False)]:
+        for text in TEXTS:
+            assert preprocessor.preproc(text, use_lemm=use_lemm, use_stem=use_stem) == \
+                baseline_preproc(preprocessor, text, use_lemm=use_lemm, use_stem=use_stem)
+
+
+def test_bounded_cache_matches_baseline():
+    small = tokenizers.Preprocessing(STOPWORDS, cache_size=3)
+    large = tokenizers.Preprocessing(STOPWORDS)
+    for text in TEXTS * 2:
+        for preprocessor in [small, large]:
+            assert preprocessor.preproc(text, use_lemm=True, use_stem=True) == \
+                baseline_preproc(preprocessor, text, use_lemm=True, use_stem=True)
+
+    assert small.cache_stats()[(True, True)]['size'] == 3
+    assert small.cache_stats()[(True, True)]['evictions'] > 0
+    assert large.cache_stats()[(True, True)]['size'] > 3
+    assert large.cache_stats()[(True, True)]['hits'] > 0
+
+
+def test_dump_load_cache_round_trip(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.bin')
+    preprocessor = tokenizers.Preprocessing(STOPWORDS)
+    for text in TEXTS:
+        preprocessor.preproc(text, use_stem=True)
+        preprocessor.preproc(text, use_lemm=True, use_stem=True)
+    entries = {key: dict(cache.entries) for key, cache in tokenizers.Preprocessing.caches.items()}
+    preprocessor.dump_cache(path)
+
+    monkeypatch.setattr(tokenizers.Preprocessing, 'caches', {})
+    loaded = tokenizers.Preprocessing(STOPWORDS, cache_path=path)
+    assert {key: dict(cache.entries) for key, cache in tokenizers.Preprocessing.caches.items()} == entries
+    for text in TEXTS:
+        assert loaded.preproc(text, use_stem=True) == baseline_preproc(loaded, text, use_stem=True)
+        assert loaded.preproc(text, use_lemm=True, use_stem=True) == \
+            baseline_preproc(loaded, text, use_lemm=True, use_stem=True)
+    stats = loaded.cache_stats()
+    assert stats[(False, True)]['misses'] == stats[(True, True)]['misses'] == 0
@@ -0,0 +1,42 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+from complexity import ComplexityModel
+from complexity.sketch import LogQuantizer
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+from .test_baseline import baseline_fit, baseline_quantile
+
+
+class QuantizedFunction:
+    def __init__(self, quantizer):
+        self.quantizer = quantizer
+
+    def complexity(self, tokens):
+        return self.quantizer.quantize(DistanceComplexityFunction().complexity(tokens))
+
+
+def test_quantized_predict():
+    texts = generate_texts(documents=80)
+    quantizer = LogQuantizer(0.05)
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction(), relative_accuracy=0.05)
+    model.fit(iter(texts[:60]), n_jobs=2)
+    distributions = baseline_fit(texts[:60], WhitespaceTokenizer(), QuantizedFunction(quantizer), 'full')
+    assert model.distributions.to_dict() == distributions
+
+    quantiles = {token: baseline_quantile(distribution, 0.95) for token, distribution in distributions.items()}
+    queries = texts[60:] + ['unknown1 w0 unknown1']
+    below_quantile = 0
+    for text in queries:
+        tokens = WhitespaceTokenizer().tokenize(text)
+        score, complexities = model.predict_tokens(tokens, weights='count', return_token_complexities=True)
+        exact = DistanceComplexityFunction().complexity(tokens)
+        expected = [quantiles[token] <= quantizer.quantize([value])[0] if token in quantiles else True
+                    for token, value in zip(tokens, exact.tolist())]
+        assert [is_complex for _, _, is_complex in complexities] == expected
+        assert score == sum(expected)
+        below_quantile += sum(value < quantiles.get(token, value) and is_complex
+                              for token, value, is_complex in zip(tokens, exact.tolist(), expected))
+    assert below_quantile > 0
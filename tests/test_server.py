@@ -0,0 +1,54 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import asyncio
+
+import pytest
+
+from complexity import ComplexityModel
+from complexity.server import ScoringServer
+from functions import DistanceComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    texts = generate_texts(documents=20)
+    model = ComplexityModel(WhitespaceTokenizer(), DistanceComplexityFunction())
+    model.fit(iter(texts), n_jobs=1)
+    return model, texts
+
+
+@pytest.fixture
+def server(fitted):
+    model, texts = fitted
+    server = ScoringServer({'model': model}, max_latency=0.2, n_jobs=1, idle_timeout=0.3)
+    yield server, model, texts
+    server.close()
+
+
+def test_failing_request_does_not_fail_its_batch(server):
+    server, model, texts = server
+
+    async def run():
+        return await asyncio.gather(server.predict('model', texts[:3], {}),
+                                    server.predict('model', [None], {}),
+                                    server.predict('model', texts[3:5], {}), return_exceptions=True)
+
+    first, failed, second = asyncio.run(run())
+    assert isinstance(failed, AttributeError)
+    assert first == model.predict(texts[:3]) and second == model.predict(texts[3:5])
+
+
+def test_idle_batchers_are_dropped(server):
+    server, model, texts = server
+
+    async def run():
+        await server.predict('model', texts[:1], {'gamma': 0.5})
+        assert len(server.batchers) == 1
+        await asyncio.sleep(0.5)
+        return len(server.batchers)
+
+    assert asyncio.run(run()) == 0
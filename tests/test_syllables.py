@@ -0,0 +1,73 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import pickle
+import re
+from pathlib import Path
+
+import pytest
+
+tokenizers = pytest.importorskip('tokenizers', exc_type=ImportError)
+from tokenizers.syllables import SyllableLookup  # noqa: E402
+
+STOPWORDS = str(Path(__file__).absolute().parents[1] / 'data' / 'stopwords.txt')
+WORDS = ['cat', 'caterpillar', 'running', 'a', 'rhythm', 'ёлка', 'собака', 'кошка', '木木', 'naïve', 'x-ray']
+
+
+def split(word):
+    """
+    :Description: splits the word after each vowel, an empty list for the words without vowels
+    """
+    syllables = re.findall(r'[^aeiouyаеёиоуыэюяï]*[aeiouyаеёиоуыэюяï]+', word)
+    return syllables + [word[len(''.join(syllables)):]] if syllables else []
+
+
+def test_table_lookup_matches_split(tmp_path):
+    SyllableLookup.build_table(str(tmp_path), WORDS[:8] + WORDS[:3], split)
+    lookup = SyllableLookup(split, cache_size=4, table_path=str(tmp_path))
+    uncached = SyllableLookup(split, cache_size=0)
+
+    assert lookup.words is not None and len(lookup.words) == 8
+    for word in (WORDS + ['unknown', ''] + WORDS) * 2:
+        assert lookup.syllables(word) == tuple(split(word)) == uncached.syllables(word)
+    copied = pickle.loads(pickle.dumps(lookup))
+    assert copied.table_path == str(tmp_path)
+    assert [copied.syllables(word) for word in WORDS] == [tuple(split(word)) for word in WORDS]
+
+
+def test_table_is_used(tmp_path):
+    SyllableLookup.build_table(str(tmp_path), WORDS, split)
+
+    def failing_split(word):
+        raise AssertionError(word)
+
+    lookup = SyllableLookup(failing_split, table_path=str(tmp_path))
+    assert [lookup.syllables(word) for word in WORDS] == [tuple(split(word)) for word in WORDS]
+
+
+@pytest.mark.parametrize('name,sort', [('RuSyllabTokenizer', False), ('RuSyllabSortedTokenizer', True)])
+def test_ru_tokenizers_match_baseline(tmp_path, name, sort):
+    rusyllab = pytest.importorskip('rusyllab')
+    text = 'кошка бегала за собакой и ёлкой ' * 2 + 'собака'
+    syllables = [syllable for syllable in rusyllab.split_words(text.split()) if syllable != ' ']
+    expected = [''.join(sorted(syllable)) for syllable in syllables] if sort else syllables
+
+    tokenizer_class = getattr(tokenizers, name)
+    SyllableLookup.build_table(str(tmp_path), text.split()[:3], tokenizer_class.split_word)
+    for table_path in [None, str(tmp_path)]:
+        assert tokenizer_class(STOPWORDS, table_path=table_path).tokenize(text) == expected
+
+
+@pytest.mark.parametrize('name,sort', [('EnSyllabTokenizer', False), ('EnSyllabSortedTokenizer', True)])
+def test_en_tokenizers_match_baseline(tmp_path, name, sort):
+    hyphen = pytest.importorskip('hyphen')
+    text = 'the caterpillar was running rhythmically after the caterpillar'
+    hyphenator = hyphen.Hyphenator('en_US')
+    syllables = [syllable for word in text.split() for syllable in hyphenator.syllables(word)]
+    expected = [''.join(sorted(syllable)) for syllable in syllables] if sort else syllables
+
+    tokenizer_class = getattr(tokenizers, name)
+    SyllableLookup.build_table(str(tmp_path), text.split()[:3], hyphenator.syllables)
+    for table_path in [None, str(tmp_path)]:
+        assert tokenizer_class(STOPWORDS, table_path=table_path).tokenize(text) == expected
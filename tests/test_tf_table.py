@@ -0,0 +1,110 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import collections
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from complexity import ComplexityModel, TermFrequencyTable
+from functions import LexicalCounterComplexityFunction
+
+from .helpers import WhitespaceTokenizer, generate_texts
+
+STOPWORDS = str(Path(__file__).absolute().parents[1] / 'data' / 'stopwords.txt')
+
+
+@pytest.fixture(scope='module')
+def texts():
+    return generate_texts(documents=40) + ['The cats, the DOGS and the cats! ёлка Ёлки', "it's a-b -c d- x y"]
+
+
+FREQUENCIES = {'w0': 5, 'ёлка': 2, '木': 1, '': 3, 'a b': 4, 'w0 ': 7}
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load_open(tmp_path, mmap):
+    table = TermFrequencyTable.build(FREQUENCIES)
+    table.save(str(tmp_path))
+    loaded = TermFrequencyTable.load(str(tmp_path), mmap=mmap)
+    opened = TermFrequencyTable.open(str(tmp_path), mmap=mmap)
+
+    assert isinstance(loaded.counts, np.memmap) == mmap
+    for candidate in [table, loaded, opened]:
+        assert len(candidate) == len(FREQUENCIES)
+        assert dict(candidate.items()) == FREQUENCIES
+        assert all(candidate[token] == count for token, count in FREQUENCIES.items())
+    counts, found = loaded.lookup(['木', 'unknown', 'w0', None, 'w0'])
+    assert counts.tolist() == [1, 0, 5, 0, 5] and found.tolist() == [True, False, True, False, True]
+
+
+def test_open_pickled_dictionary(tmp_path):
+    path = str(tmp_path / 'tf.pickle')
+    with open(path, 'wb') as f:
+        pickle.dump(FREQUENCIES, f)
+
+    assert dict(TermFrequencyTable.open(path).items()) == FREQUENCIES
+    function = LexicalCounterComplexityFunction(path)
+    assert function.complexity(['ёлка', 'w0']).tolist() == [-2, -5]
+    assert pickle.loads(pickle.dumps(function)).complexity(['a b']).tolist() == [-4]
+
+
+class LegacyCounter:
+    def __init__(self, tfs):
+        self.tfs = tfs
+
+
+def test_legacy_pickled_function():
+    data = pickle.dumps(LegacyCounter(FREQUENCIES), protocol=0).replace(
+        b'tests.test_tf_table\nLegacyCounter', b'functions.counter_cf\nLexicalCounterComplexityFunction')
+    function = pickle.loads(data)
+
+    assert isinstance(function, LexicalCounterComplexityFunction)
+    assert function.complexity(['ёлка', 'w0']).tolist() == [-2, -5]
+    with pytest.raises(KeyError):
+        function.score('unknown')
+    copied = pickle.loads(pickle.dumps(function))
+    assert dict(copied.tfs.items()) == FREQUENCIES
+
+
+def test_unknown_tokens(tmp_path):
+    TermFrequencyTable.build(FREQUENCIES).save(str(tmp_path))
+    table = TermFrequencyTable.load(str(tmp_path))
+
+    assert 'unknown' not in table and 'w0' in table
+    with pytest.raises(KeyError):
+        table['unknown']
+    with pytest.raises(KeyError):
+        LexicalCounterComplexityFunction(str(tmp_path)).complexity(['w0', 'unknown'])
+    function = LexicalCounterComplexityFunction(str(tmp_path), oov_score=0.5)
+    assert function.complexity(['w0', 'unknown', '木']).tolist() == [-5, 0.5, -1]
+    assert function.score('unknown') == 0.5 and function.score('ёлка') == -2
+    assert pickle.loads(pickle.dumps(function)).oov_score == 0.5
+
+
+def test_fit_matches_counter(texts):
+    table = TermFrequencyTable.fit(iter(texts), WhitespaceTokenizer(), n_jobs=2)
+    expected = collections.Counter(token for text in texts for token in text.split())
+
+    assert dict(table.items()) == dict(expected)
+
+
+@pytest.mark.parametrize('use_preproc', [False, True])
+@pytest.mark.parametrize('relative_accuracy', [None, 0.01])
+def test_word_counter_distributions_match_fit(tmp_path, texts, use_preproc, relative_accuracy):
+    tokenizers = pytest.importorskip('tokenizers', exc_type=ImportError)
+    tokenizer = tokenizers.WordTokenizer(STOPWORDS)
+    for text in texts:
+        assert tokenizer.term_frequencies(text, use_preproc=use_preproc, use_stem=True) == \
+            collections.Counter(tokenizer.tokenize(text, use_preproc=use_preproc, use_stem=True))
+
+    table = TermFrequencyTable.fit(iter(texts), tokenizer, n_jobs=2, use_preproc=use_preproc)
+    table.save(str(tmp_path))
+    model = ComplexityModel(tokenizer, LexicalCounterComplexityFunction(str(tmp_path)), alphabet='reduced',
+                            relative_accuracy=relative_accuracy)
+    model.fit(iter(texts), n_jobs=2, use_preproc=use_preproc)
+
+    assert table.counter_distributions(relative_accuracy).to_dict() == model.distributions.to_dict()
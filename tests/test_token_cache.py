@@ -0,0 +1,65 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import os
+
+from complexity import ComplexityModel, TokenCache
+from complexity.profiling import ProfileCollector
+from complexity.token_cache import tokenizer_key
+from functions import DistanceComplexityFunction
+
+from .helpers import CaseTokenizer, WhitespaceTokenizer, generate_texts
+
+
+def fit(texts, token_cache=None, tokenizer=None):
+    hook = ProfileCollector()
+    model = ComplexityModel(tokenizer or WhitespaceTokenizer(), DistanceComplexityFunction(), token_cache=token_cache)
+    model.fit(iter(texts), n_jobs=4, hook=hook)
+    return model, hook.report['total']['counts']
+
+
+def test_concurrent_cold_cache_fit(tmp_path, monkeypatch):
+    texts = generate_texts(documents=600, length=20)
+    expected, expected_counts = fit(texts)
+
+    makedirs = os.makedirs
+
+    def racing_makedirs(name, *args, **kwargs):
+        makedirs(name, exist_ok=True)
+        return makedirs(name, *args, **kwargs)
+
+    # another worker always creates the directory first
+    monkeypatch.setattr(os, 'makedirs', racing_makedirs)
+    for _ in range(2):
+        model, counts = fit(texts, token_cache=str(tmp_path / 'cache'))
+        assert counts.get('errors', 0) == 0
+        assert counts['documents'] == expected_counts['documents'] == len(texts)
+        assert model.distributions.to_dict() == expected.distributions.to_dict()
+
+
+def test_refit_hits_cache(tmp_path):
+    texts = generate_texts(documents=200, length=20, seed=1)
+    distinct = len(set(texts))
+    _, counts = fit(texts, token_cache=str(tmp_path))
+    assert counts['cache_misses'] >= distinct and counts['cache_misses'] + counts.get('cache_hits', 0) == len(texts)
+
+    model, counts = fit(texts, token_cache=str(tmp_path))
+    assert (counts['cache_hits'], counts.get('cache_misses', 0)) == (len(texts), 0)
+    assert model.distributions.to_dict() == fit(texts)[0].distributions.to_dict()
+
+
+def test_configurations_do_not_share_entries(tmp_path):
+    assert tokenizer_key(CaseTokenizer()) == tokenizer_key(CaseTokenizer(lower=False))
+    assert tokenizer_key(CaseTokenizer()) != tokenizer_key(CaseTokenizer(lower=True))
+
+    texts = [text.upper() for text in generate_texts(documents=100, length=20, seed=2)]
+    fit(texts, token_cache=str(tmp_path), tokenizer=CaseTokenizer())
+    model, counts = fit(texts, token_cache=str(tmp_path), tokenizer=CaseTokenizer(lower=True))
+    assert counts.get('cache_hits', 0) == 0
+    expected = fit(texts, tokenizer=CaseTokenizer(lower=True))[0]
+    assert model.distributions.to_dict() == expected.distributions.to_dict()
+
+    cache = TokenCache(str(tmp_path), CaseTokenizer(lower=True), {})
+    assert cache.tokenize('W1 W2') == ['w1', 'w2'] and cache.tokenize('W1 W2') == ['w1', 'w2']
+    assert (cache.hits, cache.misses) == (1, 1)
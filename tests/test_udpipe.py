@@ -0,0 +1,41 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import pytest
+
+pytest.importorskip('ufal.udpipe')
+tokenizers = pytest.importorskip('tokenizers', exc_type=ImportError)
+from tokenizers.udpipe_wrapper import Model  # noqa: E402
+
+CONLLU = '''# sent_id = 1
+# text = The cat sat.
+1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+2\tcat\tcat\tNOUN\tNN\tNumber=Sing\t3\tnsubj\t_\t_
+3\tsat\tsit\tVERB\tVBD\tMood=Ind|Tense=Past\t0\troot\t_\tSpaceAfter=No
+4\t.\t.\tPUNCT\t.\t_\t3\tpunct\t_\t_
+
+# sent_id = 2
+1\tКошка\tкошка\tNOUN\t_\tCase=Nom|Gender=Fem\t2\tnsubj\t_\t_
+2\tсидела\tсидеть\tVERB\t_\t_\t0\troot\t_\t_
+3\tна\tна\tADP\t_\t_\t4\tcase\t_\t_
+4\tёлке\tёлка\tNOUN\t_\tCase=Loc\t2\tobl\t_\tSpaceAfter=No
+
+1\tOk\t_\t_\t_\t_\t0\t_\t_\t_
+
+'''
+
+
+def attributes(sentences):
+    return [[tuple(getattr(node, name) for name in node.__slots__) for node in nodes] for nodes in sentences]
+
+
+@pytest.mark.parametrize('name', ['UdPipeTokenizer', 'UdPipePOSTokenizer'])
+def test_nodes_match_parse_output(name):
+    model = Model.__new__(Model)
+    sentences = model.read(CONLLU, 'conllu')
+    expected = getattr(tokenizers, name).parse_output(model.write(sentences, 'conllu'))
+
+    assert len(sentences) == 3
+    assert attributes(Model.nodes(sentences)) == attributes(expected)
+    assert attributes(Model.nodes([])) == attributes(getattr(tokenizers, name).parse_output(model.write([], 'conllu')))
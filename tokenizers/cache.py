@@ -0,0 +1,53 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import collections
+
+
+class LRUCache:
+    """
+    :Description: bounded mapping evicting the least recently used entries, with hit and miss statistics
+    :param maxsize: maximum number of entries, defaults to 100000
+    :type maxsize: int, optional
+    """
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        value = self.entries.get(key, default)
+        if value is default:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, entries):
+        for key, value in entries.items():
+            self.put(key, value)
+
+    def stats(self):
+        """
+        :Description: returns the number of entries, hits, misses, evictions and the hit rate
+        """
+        requests = self.hits + self.misses
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0}
@@ -11,7 +11,8 @@ class EnSentenceTokenizer:
         self.mode = mode
         self.spacy_model = spacy.load('en_core_web_lg')
     
-    def tokenize(self, text):
+    def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False, check_length=False,
+                 check_stopwords=False):
         if self.mode == 'classic':
             return sent_tokenize(text)
         spacy_text = self.spacy_model(text)
@@ -3,13 +3,15 @@
 #
 
 from . import preprocessor
+from .syllables import SyllableLookup
 from hyphen import Hyphenator
 
 
 class EnSyllabTokenizer():
-    def __init__(self, stopwords):
-        self.preprocessor = preprocessor.Preprocessing(stopwords)
+    def __init__(self, stopwords, cache_size=100000, table_path=None, cache_path=None):
+        self.preprocessor = preprocessor.Preprocessing(stopwords, cache_size=cache_size, cache_path=cache_path)
         self.syllbler = Hyphenator('en_US')
+        self.lookup = SyllableLookup(self.syllbler.syllables, cache_size=cache_size, table_path=table_path)
 
     def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False,
                  check_length=True, check_stopwords=True):
@@ -23,7 +25,7 @@ class EnSyllabTokenizer():
 
         syllables = []
         for word in preprocessed_text.split():
-            tokens = self.syllbler.syllables(word)
+            tokens = self.lookup.syllables(word)
             syllables += tokens
 
         return syllables
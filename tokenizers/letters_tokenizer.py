@@ -7,8 +7,8 @@ from . import preprocessor
 
 
 class LetterTokenizer():
-    def __init__(self, stopwords):
-        self.preprocessor = preprocessor.Preprocessing(stopwords)
+    def __init__(self, stopwords, cache_size=100000, cache_path=None):
+        self.preprocessor = preprocessor.Preprocessing(stopwords, cache_size=cache_size, cache_path=cache_path)
         self.rgx = re.compile(r"[^а-яА-ЯA-Za-z ]")
 
     def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False,
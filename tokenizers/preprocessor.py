@@ -4,19 +4,89 @@
 
 import pymorphy2
 import re
+import os
+import pickle
+import hashlib
 from nltk.tokenize.toktok import ToktokTokenizer
 from nltk.stem import PorterStemmer
 
+from .cache import LRUCache
+
 
 class Preprocessing:
-    def __init__(self, stopwords):
+    """
+    :Description: text preprocessing: lowercasing, cleaning, filtering, lemmatization and stemming. Normalized
+     forms of words are memoized in LRU caches shared by all instances with the same ``cache_size``, one cache per
+     combination of ``use_lemm`` and ``use_stem``
+    :param stopwords: path to the file with stopwords
+    :type stopwords: str
+    :param cache_size: maximum number of words in each normalization cache, defaults to 100000
+    :type cache_size: int, optional
+    :param cache_path: path to the file saved by :meth:`dump_cache` to warm-start the caches with, defaults to None
+    :type cache_path: str, optional
+    """
+    caches = {}
+
+    def __init__(self, stopwords, cache_size=100000, cache_path=None):
         self.rgc = re.compile("[^a-zа-яё0-9-_]")
         self.tokenizer = ToktokTokenizer()
         self.lemmatizer = pymorphy2.MorphAnalyzer()
         self.stemmer = PorterStemmer()
+        self.cache_size = cache_size
 
         with open(stopwords, 'r') as f:
             self.stopwords = set(f.read().split('\n'))
+        self.cache_key = hashlib.sha1('\n'.join(sorted(self.stopwords)).encode('utf-8')).hexdigest()
+
+        if cache_path is not None and os.path.exists(cache_path):
+            self.load_cache(cache_path)
+
+    def normalization_cache(self, use_lemm, use_stem):
+        key = (bool(use_lemm), bool(use_stem), self.cache_size)
+        if key not in Preprocessing.caches:
+            Preprocessing.caches[key] = LRUCache(self.cache_size)
+        return Preprocessing.caches[key]
+
+    def normalize(self, token, use_lemm=False, use_stem=False):
+        cache = self.normalization_cache(use_lemm, use_stem)
+        normalized = cache.get(token)
+        if normalized is None:
+            normalized = token
+            if use_lemm:
+                normalized = self.lemmatizer.parse(normalized)[0].normal_form
+            if use_stem:
+                normalized = self.stemmer.stem(normalized)
+            cache.put(token, normalized)
+        return normalized
+
+    def cache_stats(self):
+        """
+        :Description: returns statistics of the normalization caches by ``(use_lemm, use_stem)``
+        """
+        return {(use_lemm, use_stem): cache.stats() for (use_lemm, use_stem, cache_size), cache
+                in Preprocessing.caches.items() if cache_size == self.cache_size}
+
+    def dump_cache(self, path):
+        """
+        :Description: saves the normalization caches of the instance to the pickle file
+        :param path: path to the file
+        :type path: str
+        """
+        entries = {(use_lemm, use_stem): dict(cache.entries) for (use_lemm, use_stem, cache_size), cache
+                   in Preprocessing.caches.items() if cache_size == self.cache_size}
+        with open(path, 'wb') as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_cache(self, path):
+        """
+        :Description: warm-starts the normalization caches with the file saved by :meth:`dump_cache`
+        :param path: path to the file
+        :type path: str
+        """
+        with open(path, 'rb') as f:
+            entries = pickle.load(f)
+        for (use_lemm, use_stem), words in entries.items():
+            self.normalization_cache(use_lemm, use_stem).update(words)
 
     def preproc(self, text, check_stopwords=True, check_length=True, use_lemm=False, use_stem=False):
         s = re.sub("\n", r" ", text)
@@ -32,10 +102,8 @@ class Preprocessing:
                 continue
             if token[-1] == '-' or token[0] == '-':
                 continue
-            if use_lemm:
-                token = self.lemmatizer.parse(token)[0].normal_form
-            if use_stem:
-                token = self.stemmer.stem(token)
+            if use_lemm or use_stem:
+                token = self.normalize(token, use_lemm=use_lemm, use_stem=use_stem)
             if token not in self.stopwords or not check_stopwords:
                 if token not in tf:
                     tf[token] = 0
@@ -5,5 +5,6 @@
 import rusenttokenize
 
 class RuSentenceTokenizer:    
-    def tokenize(self, text):
+    def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False, check_length=False,
+                 check_stopwords=False):
         return rusenttokenize.ru_sent_tokenize(text)
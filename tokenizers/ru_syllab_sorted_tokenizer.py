@@ -4,11 +4,17 @@
 
 import rusyllab
 from . import preprocessor
+from .syllables import SyllableLookup
 
 
 class RuSyllabSortedTokenizer():
-    def __init__(self, stopwords):
-        self.preprocessor = preprocessor.Preprocessing(stopwords)
+    def __init__(self, stopwords, cache_size=100000, table_path=None, cache_path=None):
+        self.preprocessor = preprocessor.Preprocessing(stopwords, cache_size=cache_size, cache_path=cache_path)
+        self.lookup = SyllableLookup(self.split_word, cache_size=cache_size, table_path=table_path)
+
+    @staticmethod
+    def split_word(word):
+        return [syllable for syllable in rusyllab.split_words([word]) if syllable != ' ']
 
     def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False,
                  check_length=True, check_stopwords=True):
@@ -20,9 +26,7 @@ class RuSyllabSortedTokenizer():
                                                              use_stem=use_stem, check_stopwords=check_stopwords,
                                                              check_length=check_length)
 
-        syllables = rusyllab.split_words(preprocessed_text.split())
-
-        for i in range(len(syllables)):
-            syllables[i] = ''.join(sorted(syllables[i]))
-
-        return list(filter(lambda syl: syl != ' ', syllables))
\ No newline at end of file
+        syllables = []
+        for word in preprocessed_text.split():
+            syllables += [''.join(sorted(syllable)) for syllable in self.lookup.syllables(word)]
+        return syllables
\ No newline at end of file
@@ -4,11 +4,17 @@
 
 import rusyllab
 from . import preprocessor
+from .syllables import SyllableLookup
 
 
 class RuSyllabTokenizer():
-    def __init__(self, stopwords):
-        self.preprocessor = preprocessor.Preprocessing(stopwords)
+    def __init__(self, stopwords, cache_size=100000, table_path=None, cache_path=None):
+        self.preprocessor = preprocessor.Preprocessing(stopwords, cache_size=cache_size, cache_path=cache_path)
+        self.lookup = SyllableLookup(self.split_word, cache_size=cache_size, table_path=table_path)
+
+    @staticmethod
+    def split_word(word):
+        return [syllable for syllable in rusyllab.split_words([word]) if syllable != ' ']
 
     def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False,
                  check_length=True, check_stopwords=True):
@@ -20,5 +26,7 @@ class RuSyllabTokenizer():
                                                              use_stem=use_stem, check_stopwords=check_stopwords,
                                                              check_length=check_length)
 
-        syllables = rusyllab.split_words(preprocessed_text.split())
-        return list(filter(lambda syl: syl != ' ', syllables))
+        syllables = []
+        for word in preprocessed_text.split():
+            syllables += self.lookup.syllables(word)
+        return syllables
@@ -0,0 +1,93 @@
+#
+# Created by maks5507 (me@maksimeremeev.com)
+#
+
+import argparse
+import os
+
+from storage.string_pool import StringPool
+from .cache import LRUCache
+
+
+SEPARATOR = '\x1f'
+
+
+class SyllableLookup:
+    """
+    :Description: word to syllables lookup with an in-memory LRU cache in front of the syllabification function
+     and an optional prebuilt memory-mapped table, shared by all processes opening it
+    :param split: function splitting a single word into the list of syllables
+    :type split: callable
+    :param cache_size: maximum number of words in the cache, defaults to 100000
+    :type cache_size: int, optional
+    :param table_path: path to the table built by :meth:`build_table`, defaults to None
+    :type table_path: str, optional
+    """
+    def __init__(self, split, cache_size=100000, table_path=None):
+        self.split = split
+        self.cache_size = cache_size
+        self.table_path = table_path
+        self.cache = LRUCache(cache_size)
+        self.words = None
+        self.syllables_pool = None
+        if table_path is not None:
+            self.words = StringPool.load(table_path, 'words')
+            self.syllables_pool = StringPool.load(table_path, 'syllables')
+
+    def __getstate__(self):
+        return dict(split=self.split, cache_size=self.cache_size, table_path=self.table_path)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def syllables(self, word):
+        """
+        :Description: returns the syllables of the word
+        :param word: word to split
+        :type word: str
+        """
+        syllables = self.cache.get(word)
+        if syllables is None:
+            position = self.words.find(word) if self.words is not None else -1
+            if position >= 0:
+                joined = self.syllables_pool[position]
+                syllables = tuple(joined.split(SEPARATOR)) if joined else ()
+            else:
+                syllables = tuple(self.split(word))
+            self.cache.put(word, syllables)
+        return syllables
+
+    @staticmethod
+    def build_table(path, words, split):
+        """
+        :Description: splits the vocabulary into syllables and saves the table to the directory
+        :param path: path to the directory
+        :type path: str
+        :param words: vocabulary
+        :type words: iterable[str]
+        :param split: function splitting a single word into the list of syllables
+        :type split: callable
+        """
+        os.makedirs(path, exist_ok=True)
+        words = sorted(set(words), key=lambda word: word.encode('utf-8'))
+        StringPool.build(words).save(path, 'words')
+        StringPool.build([SEPARATOR.join(split(word)) for word in words]).save(path, 'syllables')
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-l', '--language', nargs='*', help='language of the vocabulary, en or ru')
+    parser.add_argument('-v', '--vocabulary', nargs='*', help='path to the vocabulary, one word per line')
+    parser.add_argument('-o', '--output', nargs='*', help='path to the table directory')
+    args = parser.parse_args()
+
+    with open(args.vocabulary[0], 'r') as f:
+        vocabulary = [word for word in f.read().split('\n') if word]
+    if args.language[0] == 'en':
+        from hyphen import Hyphenator
+        split = Hyphenator('en_US').syllables
+    else:
+        from .ru_syllab_tokenizer import RuSyllabTokenizer
+        split = RuSyllabTokenizer.split_word
+    SyllableLookup.build_table(args.output[0], vocabulary, split)
@@ -2,6 +2,8 @@
 # Created by maks5507 (me@maksimeremeev.com)
 #
 
+import os
+
 from .udpipe_wrapper import Model
 from .udpipe_wrapper import Node
 
@@ -9,6 +11,7 @@ from .udpipe_wrapper import Node
 class UdPipeTokenizer:
     def __init__(self, model_path):
         self.model = Model(model_path)
+        self.cache_key = os.path.abspath(model_path)
 
     @staticmethod
     def parse_output(out):
@@ -35,6 +38,4 @@ class UdPipeTokenizer:
         for s in sentences:
             self.model.tag(s)
             self.model.parse(s)
-        conllu = self.model.write(sentences, "conllu")
-        result = self.parse_output(conllu)
-        return result
+        return self.model.nodes(sentences)
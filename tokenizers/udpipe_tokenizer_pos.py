@@ -2,6 +2,8 @@
 # Created by maks5507 (me@maksimeremeev.com)
 #
 
+import os
+
 from .udpipe_wrapper import Model
 from .udpipe_wrapper import Node
 
@@ -9,6 +11,7 @@ from .udpipe_wrapper import Node
 class UdPipePOSTokenizer:
     def __init__(self, path):
         self.model = Model(path)
+        self.cache_key = os.path.abspath(path)
 
     @staticmethod
     def parse_output(out):
@@ -35,11 +38,10 @@ class UdPipePOSTokenizer:
         for s in sentences:
             self.model.tag(s)
             self.model.parse(s)
-        conllu = self.model.write(sentences, "conllu")
-        result = self.parse_output(conllu)
-        return result
+        return self.model.nodes(sentences)
 
-    def tokenize(self, text):
+    def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False, check_length=False,
+                 check_stopwords=False):
         processed_text = self.process(text)
         tokens = []
         for sentence in processed_text:
@@ -4,6 +4,8 @@
 
 
 class Node:
+    __slots__ = ('token', 'lemma', 'pos', 'xpos', 'feats', 'dep_rel', 'anc')
+
     def __init__(self, token, lemmatized, pos, xpos, feats, dep_rel, anc=-1):
         self.token = token
         self.lemma = lemmatized
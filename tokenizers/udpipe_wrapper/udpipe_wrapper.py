@@ -4,6 +4,8 @@
 
 import ufal.udpipe
 
+from .node import Node
+
 
 class Model:
     def __init__(self, path):
@@ -34,6 +36,26 @@ class Model:
     def parse(self, sentence):
         self.model.parse(sentence, self.model.DEFAULT)
 
+    @staticmethod
+    def nodes(sentences):
+        """
+        :Description: extracts the parsed words of the sentences directly from the UDPipe objects, the output is
+         identical to parsing the CoNLL-U output of :meth:`write`, including the empty values written as ``_``
+         and the two trailing empty sentences produced by the final empty lines
+        :param sentences: tagged and parsed sentences
+        :type sentences: list[ufal.udpipe.Sentence]
+        """
+        result = []
+        for sentence in sentences:
+            words = sentence.words
+            nodes = []
+            for i in range(1, len(words)):
+                word = words[i]
+                nodes.append(Node(word.form or '_', word.lemma or '_', word.upostag or '_', word.xpostag or '_',
+                                  word.feats or '_', word.deprel or '_', word.head - 1))
+            result.append(nodes)
+        return result + [[], []]
+
     def write(self, sentences, out_format):
         output_format = ufal.udpipe.OutputFormat.newOutputFormat(out_format)
         output = ''
@@ -3,12 +3,13 @@
 #
 
 import re
+import collections
 from . import preprocessor
 
 
 class WordTokenizer():
-    def __init__(self, stopwords):
-        self.preprocessor = preprocessor.Preprocessing(stopwords)
+    def __init__(self, stopwords, cache_size=100000, cache_path=None):
+        self.preprocessor = preprocessor.Preprocessing(stopwords, cache_size=cache_size, cache_path=cache_path)
 
     def tokenize(self, text, use_preproc=False, use_stem=False, use_lemm=False,
                  check_length=True, check_stopwords=True):
@@ -17,4 +18,16 @@ class WordTokenizer():
             preprocessed_text, _ = self.preprocessor.preproc(text, use_lemm=use_lemm,
                                                              use_stem=use_stem, check_stopwords=check_stopwords,
                                                              check_length=check_length)
-        return preprocessed_text.split()
\ No newline at end of file
+        return preprocessed_text.split()
+
+    def term_frequencies(self, text, use_preproc=False, use_stem=False, use_lemm=False,
+                         check_length=True, check_stopwords=True):
+        """
+        :Description: returns the numbers of occurrences of the tokens returned by :meth:`tokenize`, counted by
+         ``Preprocessing.preproc`` along with the preprocessing
+        """
+        if use_preproc:
+            _, tf = self.preprocessor.preproc(text, use_lemm=use_lemm, use_stem=use_stem,
+                                              check_stopwords=check_stopwords, check_length=check_length)
+            return tf
+        return collections.Counter(text.split())